@@ -1,32 +1,111 @@
-from fastapi import FastAPI, APIRouter, Request
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 import os
-from dotenv import load_dotenv
-from pydantic import BaseModel, Field
-from typing import List
-import uuid
+import sys
+from typing import List, Optional
+import asyncio
+import time
 from datetime import datetime
 import logging
 from pathlib import Path
 
-# Load environment variables
-load_dotenv()
-
-# MongoDB connection
-try:
-    mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
-    db_name = os.environ.get('DB_NAME', 'test_database')
-    client = AsyncIOMotorClient(mongo_url)
-    db = client[db_name]
-    mongo_available = True
-    print(f"Connected to MongoDB: {db_name}")
-except Exception as e:
-    print(f"MongoDB connection failed: {e}")
-    print("Running in development mode without database")
-    mongo_available = False
-    client = None
-    db = None
+# Load environment variables from a local .env file. On Vercel they come from
+# the platform, so python-dotenv is only imported when a file is present.
+API_DIR = Path(__file__).parent
+for env_path in (API_DIR / '.env', API_DIR.parent / '.env'):
+    if env_path.exists():
+        from dotenv import load_dotenv
+        load_dotenv(env_path)
+        break
+
+# Code shared with backend/server.py lives in backend/core.py, which vercel.json
+# bundles into the function (includeFiles). It is imported once .env is loaded,
+# since it reads its settings at import time.
+sys.path.insert(0, str(API_DIR.parent / 'backend'))
+from core import (  # noqa: E402
+    COMPRESSION, MONGO_BREAKER_FAILURES, MONGO_BREAKER_RESET_MS, MONGO_MAX_IDLE_TIME_MS,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS, MONGO_WAIT_QUEUE_TIMEOUT_MS, NDJSON_MEDIA_TYPE, ROLLUP_GRANULARITIES,
+    STATS_MAX_BUCKETS, STATS_PROJECTION, STATS_REBUILD_TOKEN, STATS_SORT, STATUS_CACHE_SIZE,
+    STATUS_CACHE_TTL_MS, STATUS_PAGE_MAX, STATUS_PAGE_SIZE, STATUS_PROJECTION, STATUS_RETENTION,
+    STATUS_SORT, STATUS_STREAM_BATCH_SIZE, CircuitBreaker, CompressionMiddleware, Metrics,
+    MetricsMiddleware, MongoOpRecorder, ResponseCache, RollupGranularity, StatusCheck, StatusCheckBatchItem,
+    StatusCheckBatchResult, StatusCheckCreate, StatusQuery, StatusStats, build_batch, check_rebuild_token,
+    create_pool_stats, create_status_indexes, drop_ttl_index, dumps, encode_cursor, ensure_ttl_index,
+    explain_summary, mongo_pool_options, new_status_doc, page_response, parse_batch_body, read_batch_body,
+    rollup_pipeline, rollup_updates, stats_filter, status_filter, status_query, status_stats, wants_ndjson,
+)
+
+# Configure logging. A function instance serves one request at a time and may
+# be frozen right after it, so records are written synchronously here rather
+# than through the queue used by backend/server.py.
+logging.basicConfig(
+    level=os.environ.get('LOG_LEVEL', 'INFO').upper(),
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# MongoDB connection. The client (and the motor/pymongo import) is created on
+# first use and then reused by every warm invocation of the function.
+mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+db_name = os.environ.get('DB_NAME', 'test_database')
+mongo_available = True
+client = None
+db = None
+
+# Circuit breaker and metrics; the settings and classes are in core.py
+mongo_breaker = CircuitBreaker(MONGO_BREAKER_FAILURES, MONGO_BREAKER_RESET_MS)
+metrics = Metrics()
+mongo_op = MongoOpRecorder(mongo_breaker, metrics)
+
+# Connection pool settings. An instance serves one request at a time and may be
+# frozen between invocations, so no idle connections are kept by default.
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', '100'))
+MONGO_MIN_POOL_SIZE = min(int(os.environ.get('MONGO_MIN_POOL_SIZE', '0')), MONGO_MAX_POOL_SIZE)
+mongo_pool_stats = None
+# The event loop only keeps weak references to tasks
+status_index_task = None
+indexes_ready = False
+# Failed index setup (e.g. MongoDB down on a cold start) is retried this often
+STATUS_INDEX_RETRY_MS = int(os.environ.get('STATUS_INDEX_RETRY_MS', '5000'))
+status_index_attempt_at = None
+
+def get_db():
+    global client, db, mongo_available, mongo_pool_stats, status_index_task, status_index_attempt_at
+    if db is None and mongo_available:
+        try:
+            from motor.motor_asyncio import AsyncIOMotorClient
+            mongo_pool_stats = metrics.pool_stats = create_pool_stats()
+            client = AsyncIOMotorClient(
+                mongo_url,
+                serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                event_listeners=[mongo_pool_stats],
+                **mongo_pool_options(MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE),
+            )
+            db = client[db_name]
+            logger.info(f"MongoDB client configured for: {db_name}")
+        except Exception as e:
+            logger.error(f"MongoDB connection failed: {e}")
+            logger.warning("Running in development mode without database")
+            mongo_available = False
+            return None
+    if (
+        db is not None
+        and not indexes_ready
+        and (status_index_task is None or status_index_task.done())
+        and (status_index_attempt_at is None or time.monotonic() >= status_index_attempt_at + STATUS_INDEX_RETRY_MS / 1000)
+    ):
+        # Provisioned in the background so this request is not delayed
+        status_index_attempt_at = time.monotonic()
+        status_index_task = asyncio.get_running_loop().create_task(ensure_status_indexes())
+    return db
+
+def db_available() -> bool:
+    # False when running without a database; raises 503 while the circuit is open
+    if get_db() is None:
+        return False
+    mongo_breaker.check()
+    return True
 
 # Create the main app
 app = FastAPI()
@@ -34,14 +113,62 @@ app = FastAPI()
 # Create a router with the /api prefix
 api_router = APIRouter()
 
-# Define Models
-class StatusCheck(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    client_name: str
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+async def explain_status_query(status_query: StatusQuery, limit: int) -> dict:
+    if not db_available():
+        raise HTTPException(status_code=503, detail="Database is not available")
+    query = status_filter(status_query)
+    with mongo_op("explain"):
+        cursor = db.status_checks.find(query, STATUS_PROJECTION).sort(STATUS_SORT).limit(limit + 1)
+        explanation = await cursor.explain()
+    return explain_summary(query, explanation)
+
+# Read cache for GET /status pages, invalidated on every write
+status_cache = ResponseCache(STATUS_CACHE_TTL_MS, STATUS_CACHE_SIZE)
+
+async def load_status_page(query: StatusQuery, limit: int):
+    if not db_available():
+        return [], None
+    # Fetch one extra document to know whether another page exists
+    cursor = db.status_checks.find(status_filter(query), STATUS_PROJECTION).sort(STATUS_SORT).limit(limit + 1)
+    with mongo_op("find") as op:
+        status_checks = await cursor.to_list(limit + 1)
+        op.documents = len(status_checks)
+    next_cursor = None
+    if len(status_checks) > limit:
+        status_checks = status_checks[:limit]
+        next_cursor = encode_cursor(status_checks[-1])
+    return status_checks, next_cursor
+
+# Streaming (NDJSON) listing
+async def stream_status_checks(query: StatusQuery, limit: Optional[int]):
+    # Availability is checked by the caller before the response starts
+    cursor = db.status_checks.find(status_filter(query), STATUS_PROJECTION).sort(STATUS_SORT).batch_size(STATUS_STREAM_BATCH_SIZE)
+    if limit:
+        cursor = cursor.limit(limit)
+    try:
+        with mongo_op("find_stream") as op:
+            async for status_check in cursor:
+                op.documents += 1
+                yield dumps(status_check) + b"\n"
+    except Exception as e:
+        # Headers are already sent, so the stream just ends early
+        logger.error(f"Database error while streaming status checks: {e}")
 
-class StatusCheckCreate(BaseModel):
-    client_name: str
+# Per-client rollups kept up to date on every write
+async def record_rollups(status_docs: List[dict]):
+    updates = rollup_updates(status_docs)
+    if not updates:
+        return
+    try:
+        with mongo_op("bulk_write") as op:
+            op.documents = len(updates)
+            await db.status_rollups.bulk_write(updates, ordered=False)
+    except Exception as e:
+        # Counts drift until the next rebuild; the status checks themselves are stored
+        logger.error(f"Rollup update failed: {e}")
+
+async def rebuild_rollups(granularity: str):
+    await db.status_checks.aggregate(rollup_pipeline(granularity)).to_list(None)
 
 # Add routes to the router
 @api_router.get("/")
@@ -50,26 +177,172 @@ async def root():
 
 @api_router.post("/status", response_model=StatusCheck)
 async def create_status_check(input: StatusCheckCreate):
-    status_dict = input.dict()
-    status_obj = StatusCheck(**status_dict)
-    if mongo_available and db:
+    status_doc = new_status_doc(input.client_name)
+    # Encode before the insert, which adds an _id to the document
+    body = dumps(status_doc)
+    if db_available():
         try:
-            _ = await db.status_checks.insert_one(status_obj.dict())
+            with mongo_op("insert_one") as op:
+                op.documents = 1
+                _ = await db.status_checks.insert_one(status_doc)
         except Exception as e:
-            print(f"Database error: {e}")
-    return status_obj
+            # A function instance has no durable local disk to journal the write
+            # to, so the client is told to retry instead of getting a 200 for a
+            # status check that was never stored
+            logger.error(f"Database error: {e}")
+            raise HTTPException(status_code=503, detail="Status check was not stored", headers={"Retry-After": "1"})
+        status_cache.invalidate()
+        await record_rollups([status_doc])
+    return Response(body, media_type="application/json")
+
+@api_router.get("/ready")
+async def readiness():
+    # Readiness, unlike the liveness route /api/. There is no startup hook in a
+    # function, so the ping also opens the first connection of a new instance.
+    if get_db() is None:
+        return {"ready": True, "database": "disabled"}
+    last_ping_ms = None
+    if mongo_breaker.state == "closed" or time.monotonic() >= mongo_breaker.opened_at + mongo_breaker.reset_timeout:
+        started = time.perf_counter()
+        try:
+            with mongo_op("ping"):
+                await db.command("ping")
+            last_ping_ms = round((time.perf_counter() - started) * 1000, 2)
+        except Exception:
+            pass
+    if last_ping_ms is not None and status_index_task is not None and not status_index_task.done():
+        # A new instance answers once its index setup has finished
+        await asyncio.shield(status_index_task)
+    ready = last_ping_ms is not None and indexes_ready and mongo_breaker.state == "closed"
+    body = {
+        "ready": ready,
+        "database": "mongo",
+        "circuit": mongo_breaker.state,
+        "indexes_ready": indexes_ready,
+        "last_ping_ms": last_ping_ms,
+        "pool": {
+            **mongo_pool_stats.snapshot(),
+            "max_size": MONGO_MAX_POOL_SIZE,
+            "min_size": MONGO_MIN_POOL_SIZE,
+            "max_idle_time_ms": MONGO_MAX_IDLE_TIME_MS or None,
+            "wait_queue_timeout_ms": MONGO_WAIT_QUEUE_TIMEOUT_MS or None,
+        },
+    }
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+@api_router.get("/health/db")
+async def database_health():
+    # No background monitor in a serverless function, so ping on demand
+    if get_db() is None:
+        return {"database": "disabled"}
+    last_ping_ms = None
+    if mongo_breaker.state == "closed" or time.monotonic() >= mongo_breaker.opened_at + mongo_breaker.reset_timeout:
+        started = time.perf_counter()
+        try:
+            with mongo_op("ping"):
+                await db.command("ping")
+            last_ping_ms = round((time.perf_counter() - started) * 1000, 2)
+        except Exception:
+            pass
+    body = {
+        "database": "up" if mongo_breaker.state == "closed" else "down",
+        "circuit": mongo_breaker.state,
+        "consecutive_failures": mongo_breaker.failures,
+        "last_error": mongo_breaker.last_error,
+        "last_ping_ms": last_ping_ms,
+    }
+    return JSONResponse(body, status_code=200 if mongo_breaker.state == "closed" else 503)
 
 @api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    if mongo_available and db:
+async def get_status_checks(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=STATUS_PAGE_MAX),
+    after: Optional[str] = None,
+    client_name: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    stream: bool = False,
+    explain: bool = False,
+):
+    query = status_query(client_name, since, until, after)
+    if explain:
+        return JSONResponse(await explain_status_query(query, limit or STATUS_PAGE_SIZE))
+    if wants_ndjson(request, stream):
+        # Unbounded unless a limit is given; documents are written as they arrive
+        status_checks = stream_status_checks(query, limit) if db_available() else iter(())
+        return StreamingResponse(status_checks, media_type=NDJSON_MEDIA_TYPE)
+    limit = limit or STATUS_PAGE_SIZE
+    key = (limit, after, client_name, since, until)
+    page = status_cache.get(key)
+    if page is None:
+        generation = status_cache.generation
         try:
-            status_checks = await db.status_checks.find().to_list(1000)
-            return [StatusCheck(**status_check) for status_check in status_checks]
+            status_checks, next_cursor = await load_status_page(query, limit)
+        except HTTPException:
+            raise
         except Exception as e:
-            print(f"Database error: {e}")
+            logger.error(f"Database error: {e}")
             return []
-    else:
-        return []
+        page = status_cache.render(status_checks, next_cursor)
+        status_cache.set(key, page, generation)
+    return page_response(page, request)
+
+@api_router.post("/status/batch", response_model=StatusCheckBatchResult)
+async def create_status_checks_batch(request: Request):
+    items = parse_batch_body(await read_batch_body(request), request.headers.get("content-type", ""))
+    results, status_docs = build_batch(items)
+    failed = {}
+    if status_docs and db_available():
+        from pymongo.errors import BulkWriteError
+        try:
+            # Unordered so one bad document does not stop the rest of the batch
+            with mongo_op("insert_many") as op:
+                op.documents = len(status_docs)
+                await db.status_checks.insert_many([doc for _, doc in status_docs], ordered=False)
+        except BulkWriteError as e:
+            for write_error in e.details.get("writeErrors", []):
+                failed[status_docs[write_error["index"]][0]] = write_error.get("errmsg", "Write failed")
+        except Exception as e:
+            logger.error(f"Database error in create_status_checks_batch: {e}")
+            failed = {index: "Database error" for index, _ in status_docs}
+        status_cache.invalidate()
+        await record_rollups([doc for index, doc in status_docs if index not in failed])
+    for index, error in failed.items():
+        results[index] = StatusCheckBatchItem(index=index, error=error)
+    return StatusCheckBatchResult(inserted=len(status_docs) - len(failed), results=results)
+
+@api_router.get("/status/stats", response_model=StatusStats)
+async def get_status_stats(
+    granularity: RollupGranularity = "hour",
+    client_name: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    # Served from rollup documents, so the cost is O(buckets) rather than O(status checks)
+    buckets = []
+    if db_available():
+        cursor = db.status_rollups.find(stats_filter(granularity, client_name, since, until), STATS_PROJECTION)
+        with mongo_op("find_rollups") as op:
+            buckets = await cursor.sort(STATS_SORT).to_list(STATS_MAX_BUCKETS + 1)
+            op.documents = len(buckets)
+    return status_stats(granularity, buckets)
+
+if STATS_REBUILD_TOKEN:
+    @api_router.post("/status/stats/rebuild")
+    async def rebuild_status_stats(request: Request, granularity: Optional[RollupGranularity] = None):
+        check_rebuild_token(request)
+        if not db_available():
+            raise HTTPException(status_code=503, detail="Database is not available")
+        granularities = [granularity] if granularity else list(ROLLUP_GRANULARITIES)
+        with mongo_op("aggregate"):
+            for name in granularities:
+                await rebuild_rollups(name)
+        return {"rebuilt": granularities}
+
+@api_router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    # Per function instance; each warm container keeps its own counters
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 # Include the router in the main app (without prefix for Vercel)
 app.include_router(api_router)
@@ -81,14 +354,27 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
+if COMPRESSION:
+    app.add_middleware(CompressionMiddleware, metrics=metrics)
+
+# Added last so it wraps every other middleware and sees the final status
+app.add_middleware(MetricsMiddleware, metrics=metrics)
+
+# Retention for status_checks. Only the TTL index is managed here; archival and
+# capped mode need the long-running backend/server.py.
+async def ensure_status_indexes():
+    global indexes_ready
+    try:
+        if STATUS_RETENTION == 'ttl':
+            await ensure_ttl_index(db)
+        elif STATUS_RETENTION == 'none':
+            await drop_ttl_index(db)
+    except Exception as e:
+        logger.warning(f"Retention setup failed for {STATUS_RETENTION}: {e}")
+    indexes_ready = await create_status_indexes(db)
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
@@ -96,5 +382,11 @@ async def shutdown_db_client():
         client.close()
 
 # Handler for Vercel serverless function
+# Mangum buffers streamed bodies into a single Lambda response; NDJSON is
+# listed as a text type so it is returned as-is instead of base64-encoded.
+# Lifespan is off because Mangum would run startup and shutdown around every
+# invocation, closing the Mongo client that warm invocations should reuse;
+# one-time setup happens lazily in get_db() instead.
 from mangum import Mangum
-handler = Mangum(app)
\ No newline at end of file
+from mangum.adapter import DEFAULT_TEXT_MIME_TYPES
+handler = Mangum(app, lifespan="off", text_mime_types=[*DEFAULT_TEXT_MIME_TYPES, NDJSON_MEDIA_TYPE])
\ No newline at end of file
@@ -0,0 +1,988 @@
+from fastapi import HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from starlette.datastructures import Headers, MutableHeaders
+from pydantic import BaseModel, Field, ValidationError
+from typing import Dict, List, Literal, NamedTuple, Optional, Tuple
+import asyncio
+import base64
+import bisect
+import hashlib
+import importlib.util
+import json
+import logging
+import math
+import os
+import secrets
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Code shared by backend/server.py and the serverless api/index.py. Both
+# import it at startup, so nothing here may import pymongo, motor or the
+# optional compression packages at module level: the serverless cold start
+# only pays for what a request actually uses.
+
+logger = logging.getLogger(__name__)
+
+def env_flag(name: str, default: str = 'false') -> bool:
+    return os.environ.get(name, default).lower() in ('1', 'true', 'yes', 'on')
+
+# Circuit breaker in front of MongoDB: after MONGO_BREAKER_FAILURES consecutive
+# connection failures requests fail fast with 503 instead of waiting for
+# server selection, and after MONGO_BREAKER_RESET_MS a single probe is let through
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '2000'))
+MONGO_BREAKER_FAILURES = int(os.environ.get('MONGO_BREAKER_FAILURES', '3'))
+MONGO_BREAKER_RESET_MS = int(os.environ.get('MONGO_BREAKER_RESET_MS', '5000'))
+
+def is_connection_error(error: Exception) -> bool:
+    # Imported here to keep pymongo off the cold-start path
+    from pymongo.errors import ConnectionFailure
+    return isinstance(error, (ConnectionFailure, asyncio.TimeoutError))
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, reset_ms: int):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_ms / 1000
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.last_error = None
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.opened_at + self.reset_timeout - time.monotonic()))
+
+    def check(self):
+        if self.state == "closed":
+            return
+        if self.state == "open" and time.monotonic() >= self.opened_at + self.reset_timeout:
+            self.state = "half_open"
+        if self.state == "half_open" and not self.probing:
+            self.probing = True
+            return
+        raise HTTPException(
+            status_code=503,
+            detail="Database is unavailable",
+            headers={"Retry-After": str(self.retry_after())},
+        )
+
+    def record_success(self):
+        if self.state != "closed":
+            logger.info("MongoDB is reachable again, closing the circuit")
+        self.state = "closed"
+        self.failures = 0
+        self.probing = False
+        self.last_error = None
+
+    def record_failure(self, error: Exception):
+        self.failures += 1
+        self.probing = False
+        self.last_error = str(error)
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                logger.warning(f"MongoDB is unreachable, opening the circuit: {error}")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    @contextmanager
+    def track(self):
+        try:
+            yield
+        except Exception as e:
+            if is_connection_error(e):
+                self.record_failure(e)
+            else:
+                # Any answer from the server proves it is reachable
+                self.record_success()
+            raise
+        except BaseException:
+            self.probing = False
+            raise
+        else:
+            self.record_success()
+
+# Request and MongoDB metrics, exported in Prometheus text format at /metrics
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LATENCY_QUANTILES = (0.5, 0.95, 0.99)
+
+class Histogram:
+    __slots__ = ("counts", "sum", "count", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        # Linear interpolation inside the bucket that holds the requested rank
+        rank = q * self.count
+        cumulative = 0
+        lower = 0.0
+        for bound, count in zip(LATENCY_BUCKETS + (self.max,), self.counts):
+            if count and cumulative + count >= rank:
+                return lower + (min(bound, self.max) - lower) * (rank - cumulative) / count
+            cumulative += count
+            lower = bound
+        return self.max
+
+class MetricsText:
+    def __init__(self):
+        self.lines = []
+
+    @staticmethod
+    def labels(**values) -> str:
+        escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"') for value in values.values())
+        return "{" + ",".join(f'{key}="{value}"' for key, value in zip(values, escaped)) + "}"
+
+    def series(self, name: str, help_text: str, kind: str, series: dict, label_names: tuple):
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+        for key, value in series.items():
+            self.lines.append(f"{name}{self.labels(**dict(zip(label_names, key)))} {value}")
+
+    def counter(self, name: str, help_text: str, series: dict, label_names: tuple):
+        self.series(name, help_text, "counter", series, label_names)
+
+    def value(self, name: str, help_text: str, kind: str, value):
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+        self.lines.append(f"{name} {value}")
+
+    def histogram(self, name: str, help_text: str, series: dict, label_names: tuple):
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} histogram")
+        for key, hist in series.items():
+            base = dict(zip(label_names, key))
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), hist.counts):
+                cumulative += count
+                self.lines.append(f"{name}_bucket{self.labels(**base, le=bound)} {cumulative}")
+            self.lines.append(f"{name}_sum{self.labels(**base)} {hist.sum}")
+            self.lines.append(f"{name}_count{self.labels(**base)} {hist.count}")
+        self.lines.append(f"# HELP {name}_quantile {help_text} (estimated from the histogram)")
+        self.lines.append(f"# TYPE {name}_quantile gauge")
+        for key, hist in series.items():
+            base = dict(zip(label_names, key))
+            for q in LATENCY_QUANTILES:
+                self.lines.append(f"{name}_quantile{self.labels(**base, quantile=q)} {hist.quantile(q)}")
+
+    def text(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+class Metrics:
+    # Series every entry point has; subclasses add their own in write()
+    def __init__(self):
+        self.requests = {}
+        self.latency = {}
+        self.in_flight = 0
+        self.mongo_latency = {}
+        self.mongo_documents = {}
+        self.mongo_errors = {}
+        self.compression_input = {}
+        self.compression_output = {}
+        self.compression_seconds = {}
+        self.overhead = 0.0
+        self.pool_stats = None
+
+    def observe_request(self, method: str, route: str, status: int, duration: float):
+        key = (method, route, str(status))
+        self.requests[key] = self.requests.get(key, 0) + 1
+        histogram = self.latency.get((method, route))
+        if histogram is None:
+            histogram = self.latency[(method, route)] = Histogram()
+        histogram.observe(duration)
+
+    def observe_mongo(self, operation: str, duration: float, documents: int, failed: bool):
+        key = (operation,)
+        histogram = self.mongo_latency.get(key)
+        if histogram is None:
+            histogram = self.mongo_latency[key] = Histogram()
+        histogram.observe(duration)
+        self.mongo_documents[key] = self.mongo_documents.get(key, 0) + documents
+        if failed:
+            self.mongo_errors[key] = self.mongo_errors.get(key, 0) + 1
+
+    def observe_compression(self, encoding: str, input_bytes: int, output_bytes: int, duration: float):
+        key = (encoding,)
+        self.compression_input[key] = self.compression_input.get(key, 0) + input_bytes
+        self.compression_output[key] = self.compression_output.get(key, 0) + output_bytes
+        self.compression_seconds[key] = self.compression_seconds.get(key, 0.0) + duration
+
+    def write(self, out: MetricsText):
+        out.counter("http_requests_total", "HTTP requests by route and status.", self.requests, ("method", "route", "status"))
+        out.histogram("http_request_duration_seconds", "HTTP request latency.", self.latency, ("method", "route"))
+        out.value("http_requests_in_flight", "HTTP requests currently being served.", "gauge", self.in_flight)
+        out.histogram("mongo_operation_duration_seconds", "MongoDB operation latency.", self.mongo_latency, ("operation",))
+        out.counter("mongo_operation_documents_total", "Documents read or written by MongoDB operations.",
+                    self.mongo_documents, ("operation",))
+        out.counter("mongo_operation_errors_total", "Failed MongoDB operations.", self.mongo_errors, ("operation",))
+        out.counter("http_response_compression_input_bytes_total", "Response bytes before compression.",
+                    self.compression_input, ("encoding",))
+        out.counter("http_response_compression_output_bytes_total", "Response bytes after compression.",
+                    self.compression_output, ("encoding",))
+        out.counter("http_response_compression_seconds_total", "Time spent compressing responses.",
+                    self.compression_seconds, ("encoding",))
+        if self.pool_stats is not None:
+            pool = self.pool_stats.snapshot()
+            out.series("mongo_pool_connections", "MongoDB connections open and checked out.", "gauge",
+                       {("open",): pool["open"], ("in_use",): pool["in_use"]}, ("state",))
+            out.value("mongo_pool_checkout_failures_total", "Failed MongoDB connection checkouts.", "counter",
+                      pool["checkout_failures"])
+        out.value("metrics_overhead_seconds_total", "Time spent recording request metrics.", "counter", self.overhead)
+
+    def render(self) -> str:
+        out = MetricsText()
+        self.write(out)
+        return out.text()
+
+class MongoOp:
+    __slots__ = ("documents",)
+
+    def __init__(self):
+        self.documents = 0
+
+class RequestTiming:
+    __slots__ = ("db_seconds", "db_operations")
+
+    def __init__(self):
+        self.db_seconds = 0.0
+        self.db_operations = 0
+
+# Set per request by an access log middleware; tasks started by a request inherit it
+request_timing: ContextVar[Optional[RequestTiming]] = ContextVar("request_timing", default=None)
+
+class MongoOpRecorder:
+    def __init__(self, breaker: CircuitBreaker, metrics: Metrics):
+        self.breaker = breaker
+        self.metrics = metrics
+
+    @contextmanager
+    def __call__(self, operation: str):
+        # Times one MongoDB call and feeds its outcome to the circuit breaker;
+        # callers set op.documents to the number of documents read or written
+        op = MongoOp()
+        started = time.perf_counter()
+        failed = True
+        try:
+            with self.breaker.track():
+                yield op
+            failed = False
+        finally:
+            duration = time.perf_counter() - started
+            self.metrics.observe_mongo(operation, duration, op.documents, failed)
+            timing = request_timing.get()
+            if timing is not None:
+                timing.db_seconds += duration
+                timing.db_operations += 1
+
+class MetricsMiddleware:
+    def __init__(self, app, metrics: Metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        metrics = self.metrics
+        started = time.perf_counter()
+        metrics.in_flight += 1
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            finished = time.perf_counter()
+            metrics.in_flight -= 1
+            # Label by route template to keep the number of series bounded
+            route = scope.get("route")
+            metrics.observe_request(scope["method"], getattr(route, "path", "unmatched"), status, finished - started)
+            metrics.overhead += time.perf_counter() - finished
+
+# Response compression negotiated from Accept-Encoding; brotli and zstd are
+# offered when their packages are installed, and imported only when a response
+# is compressed with them. Bodies with a Content-Length under
+# COMPRESSION_MIN_SIZE are sent as they are. Streamed bodies are compressed
+# chunk by chunk and flushed after every chunk, so NDJSON and CSV clients still
+# get data as soon as it is produced. Server-sent events are never compressed.
+COMPRESSION = env_flag('COMPRESSION', 'true')
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+# Server preference when a client accepts several encodings with the same q-value
+COMPRESSION_ENCODINGS = [
+    encoding.strip() for encoding in os.environ.get('COMPRESSION_ENCODINGS', 'zstd,br,gzip').split(',') if encoding.strip()
+]
+COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', '6'))
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', '4'))
+COMPRESSION_ZSTD_LEVEL = int(os.environ.get('COMPRESSION_ZSTD_LEVEL', '3'))
+# Chunks at least this large are compressed off the event loop
+COMPRESSION_THREAD_MIN_SIZE = int(os.environ.get('COMPRESSION_THREAD_MIN_SIZE', '262144'))
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+UNCOMPRESSED_TYPES = ("text/event-stream",)
+
+class GzipEncoder:
+    def __init__(self):
+        self.compressor = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, finish: bool) -> bytes:
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_FINISH if finish else zlib.Z_SYNC_FLUSH)
+
+class BrotliEncoder:
+    def __init__(self):
+        import brotli
+
+        self.compressor = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+
+    def compress(self, data: bytes, finish: bool) -> bytes:
+        output = self.compressor.process(data)
+        return output + (self.compressor.finish() if finish else self.compressor.flush())
+
+class ZstdEncoder:
+    def __init__(self):
+        import zstandard
+
+        self.zstandard = zstandard
+        self.compressor = zstandard.ZstdCompressor(level=COMPRESSION_ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes, finish: bool) -> bytes:
+        output = self.compressor.compress(data)
+        mode = self.zstandard.COMPRESSOBJ_FLUSH_FINISH if finish else self.zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        return output + self.compressor.flush(mode)
+
+ENCODERS = {"gzip": GzipEncoder}
+if importlib.util.find_spec("brotli") is not None:
+    ENCODERS["br"] = BrotliEncoder
+if importlib.util.find_spec("zstandard") is not None:
+    ENCODERS["zstd"] = ZstdEncoder
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        params = params.strip().replace(" ", "")
+        try:
+            accepted[name.strip().lower()] = float(params[2:]) if params.startswith("q=") else 1.0
+        except ValueError:
+            continue
+    best, best_q = None, 0.0
+    for encoding in COMPRESSION_ENCODINGS:
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if encoding in ENCODERS and q > best_q:
+            best, best_q = encoding, q
+    return best
+
+class CompressionMiddleware:
+    def __init__(self, app, metrics: Metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                encoding = negotiate_encoding(value.decode("latin-1"))
+                break
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        encoder = None
+
+        def compressible(start) -> bool:
+            headers = Headers(raw=start["headers"])
+            content_type = headers.get("content-type", "")
+            if (
+                start["status"] in (204, 304)
+                or "content-encoding" in headers
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+                or content_type.startswith(UNCOMPRESSED_TYPES)
+            ):
+                return False
+            # Streamed responses have no Content-Length and are always compressed
+            length = headers.get("content-length")
+            return length is None or int(length) >= COMPRESSION_MIN_SIZE
+
+        async def send_wrapper(message):
+            nonlocal encoder
+            if message["type"] == "http.response.start":
+                # Decided from the headers alone so the start is never held
+                # back; an event stream gets its headers before the first event
+                if compressible(message):
+                    encoder = ENCODERS[encoding]()
+                    headers = MutableHeaders(scope=message)
+                    headers["Content-Encoding"] = encoding
+                    headers.add_vary_header("Accept-Encoding")
+                    if "content-length" in headers:
+                        del headers["content-length"]
+                    etag = headers.get("etag")
+                    if etag and not etag.startswith("W/"):
+                        # Different bytes for the same representation, so the validator is weak
+                        headers["etag"] = "W/" + etag
+                await send(message)
+                return
+            if message["type"] != "http.response.body" or encoder is None:
+                await send(message)
+                return
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            started = time.perf_counter()
+            if len(body) >= COMPRESSION_THREAD_MIN_SIZE:
+                data = await asyncio.to_thread(encoder.compress, body, not more_body)
+            else:
+                data = encoder.compress(body, not more_body)
+            self.metrics.observe_compression(encoding, len(body), len(data), time.perf_counter() - started)
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+# Connection pool options other than the sizes, which each entry point picks
+# for itself. 0 leaves the driver defaults: idle connections are never closed,
+# and a request waits for a free connection until server selection times out.
+MONGO_MAX_IDLE_TIME_MS = int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', '0'))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', '0'))
+
+def mongo_pool_options(max_pool_size: int, min_pool_size: int) -> dict:
+    options = {"maxPoolSize": max_pool_size, "minPoolSize": min_pool_size}
+    if MONGO_MAX_IDLE_TIME_MS:
+        options["maxIdleTimeMS"] = MONGO_MAX_IDLE_TIME_MS
+    if MONGO_WAIT_QUEUE_TIMEOUT_MS:
+        options["waitQueueTimeoutMS"] = MONGO_WAIT_QUEUE_TIMEOUT_MS
+    return options
+
+def create_pool_stats():
+    # Defined here because subclassing the driver's listener imports pymongo
+    from pymongo import monitoring
+
+    class PoolStats(monitoring.ConnectionPoolListener):
+        # Connection pool events arrive on driver threads
+        def __init__(self):
+            self.lock = threading.Lock()
+            self.open = 0
+            self.in_use = 0
+            self.checkout_failures = 0
+            self.cleared = 0
+
+        def add(self, name: str, value: int):
+            with self.lock:
+                setattr(self, name, getattr(self, name) + value)
+
+        def snapshot(self) -> dict:
+            with self.lock:
+                return {
+                    "open": self.open,
+                    "in_use": self.in_use,
+                    "checkout_failures": self.checkout_failures,
+                    "cleared": self.cleared,
+                }
+
+        def connection_created(self, event):
+            self.add("open", 1)
+
+        def connection_closed(self, event):
+            self.add("open", -1)
+
+        def connection_checked_out(self, event):
+            self.add("in_use", 1)
+
+        def connection_checked_in(self, event):
+            self.add("in_use", -1)
+
+        def connection_check_out_failed(self, event):
+            self.add("checkout_failures", 1)
+
+        def pool_cleared(self, event):
+            self.add("cleared", 1)
+
+        def pool_created(self, event):
+            pass
+
+        def pool_ready(self, event):
+            pass
+
+        def pool_closed(self, event):
+            pass
+
+        def connection_ready(self, event):
+            pass
+
+        def connection_check_out_started(self, event):
+            pass
+
+    return PoolStats()
+
+# Status check ids. "uuid4" ids are random; "uuid7" ids (RFC 9562) start with
+# the creation time in milliseconds followed by a counter, so they sort in
+# creation order and new ids land at the right edge of the id index instead of
+# on random pages. Both are 36-character UUID strings, so either is accepted on
+# reads and in cursors.
+STATUS_ID_FORMAT = os.environ.get('STATUS_ID_FORMAT', 'uuid4')
+
+class UUID7Generator:
+    def __init__(self):
+        self.last_ms = 0
+        self.counter = 0
+
+    def __call__(self) -> str:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > self.last_ms:
+            self.last_ms = now_ms
+            # Random start with the top bit clear leaves room to count up
+            self.counter = secrets.randbits(11)
+        else:
+            # Same millisecond (or the clock went back): keep ids increasing
+            self.counter += 1
+            if self.counter > 0xFFF:
+                self.last_ms += 1
+                self.counter = 0
+        value = (self.last_ms << 80) | (0x7 << 76) | (self.counter << 64) | (0b10 << 62) | secrets.randbits(62)
+        return str(uuid.UUID(int=value))
+
+uuid7 = UUID7Generator()
+
+# Define Models
+def new_status_id() -> str:
+    if STATUS_ID_FORMAT == 'uuid7':
+        return uuid7()
+    return str(uuid.uuid4())
+
+class StatusCheck(BaseModel):
+    id: str = Field(default_factory=new_status_id)
+    client_name: str
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+class StatusCheckCreate(BaseModel):
+    client_name: str
+
+class StatusCheckBatchItem(BaseModel):
+    index: int
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+class StatusCheckBatchResult(BaseModel):
+    inserted: int
+    results: List[StatusCheckBatchItem]
+
+class StatusStatsBucket(BaseModel):
+    bucket: datetime
+    client_name: str
+    count: int
+
+class StatusStats(BaseModel):
+    granularity: str
+    total: int
+    clients: Dict[str, int]
+    buckets: List[StatusStatsBucket]
+    # More than STATS_MAX_BUCKETS matched; total and clients cover the returned buckets only
+    truncated: bool = False
+
+# Status checks are stored with exactly the StatusCheck fields, so raw documents
+# are encoded directly instead of being rebuilt and re-validated as models. The
+# output is byte-for-byte what FastAPI renders for the models.
+STATUS_PROJECTION = {"_id": 0, "id": 1, "client_name": 1, "timestamp": 1}
+STATUS_FIELDS = ("id", "client_name", "timestamp")
+
+def new_status_doc(client_name: str) -> dict:
+    return {"id": new_status_id(), "client_name": client_name, "timestamp": datetime.utcnow()}
+
+def json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=json_default).encode()
+
+# Keyset pagination over the indexed (timestamp, id) key
+STATUS_SORT = [("timestamp", 1), ("id", 1)]
+STATUS_PAGE_SIZE = int(os.environ.get('STATUS_PAGE_SIZE', '1000'))
+STATUS_PAGE_MAX = int(os.environ.get('STATUS_PAGE_MAX', '1000'))
+
+def encode_cursor(status_check: dict) -> str:
+    raw = f"{status_check['timestamp'].isoformat()}|{status_check['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, status_id = raw.split("|", 1)
+        # Ids are always UUID strings, so a cursor cut short is caught here
+        uuid.UUID(status_id)
+        return to_naive_utc(datetime.fromisoformat(timestamp)), status_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def keyset_filter(after: Optional[Tuple[datetime, str]]) -> dict:
+    if not after:
+        return {}
+    timestamp, status_id = after
+    return {"$or": [
+        {"timestamp": {"$gt": timestamp}},
+        {"timestamp": timestamp, "id": {"$gt": status_id}},
+    ]}
+
+# Indexes provisioned at startup; every list query is served by one of them.
+# (timestamp, id) and (client_name, timestamp, id) also cover lookups on
+# their leading fields, so no separate single-field indexes are needed.
+STATUS_INDEXES = [
+    ("id_unique", [("id", 1)], {"unique": True}),
+    ("timestamp_id", STATUS_SORT, {}),
+    ("client_name_timestamp_id", [("client_name", 1)] + STATUS_SORT, {}),
+]
+
+def to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Timestamps are stored as naive UTC datetimes
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+class StatusQuery(NamedTuple):
+    # Filters for listing status checks, independent of the storage engine;
+    # results are always in STATUS_SORT order
+    client_name: Optional[str] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    after: Optional[Tuple[datetime, str]] = None
+
+def status_query(
+    client_name: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    after: Optional[str] = None,
+) -> StatusQuery:
+    return StatusQuery(
+        client_name or None,
+        to_naive_utc(since),
+        to_naive_utc(until),
+        decode_cursor(after) if after else None,
+    )
+
+def status_filter(status_query: StatusQuery) -> dict:
+    query = {}
+    if status_query.client_name:
+        query["client_name"] = status_query.client_name
+    since, until = status_query.since, status_query.until
+    if since or until:
+        query["timestamp"] = {}
+        if since:
+            query["timestamp"]["$gte"] = since
+        if until:
+            query["timestamp"]["$lt"] = until
+    keyset = keyset_filter(status_query.after)
+    if keyset:
+        query = {"$and": [query, keyset]} if query else keyset
+    return query
+
+def plan_indexes(plan: dict) -> List[str]:
+    names = []
+    if isinstance(plan, dict):
+        if "indexName" in plan:
+            names.append(plan["indexName"])
+        for value in plan.values():
+            names.extend(plan_indexes(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            names.extend(plan_indexes(value))
+    return names
+
+def explain_summary(query: dict, explanation: dict) -> dict:
+    winning_plan = explanation.get("queryPlanner", {}).get("winningPlan", {})
+    stats = explanation.get("executionStats", {})
+    return jsonable_encoder({
+        "query": query,
+        "sort": dict(STATUS_SORT),
+        "indexes": plan_indexes(winning_plan),
+        "winning_plan": winning_plan,
+        "execution_stats": {
+            key: stats.get(key)
+            for key in ("nReturned", "totalKeysExamined", "totalDocsExamined", "executionTimeMillis")
+        },
+    })
+
+# Read cache for GET /status pages, invalidated on every write
+STATUS_CACHE_TTL_MS = int(os.environ.get('STATUS_CACHE_TTL_MS', '2000'))
+STATUS_CACHE_SIZE = int(os.environ.get('STATUS_CACHE_SIZE', '128'))
+
+class CachedPage(NamedTuple):
+    body: bytes
+    etag: str
+    next_cursor: Optional[str]
+    expires_at: float
+
+class ResponseCache:
+    def __init__(self, ttl_ms: int, max_entries: int):
+        self.ttl = ttl_ms / 1000
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        # Bumped on invalidation so reads that raced a write are not stored
+        self.generation = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    def set(self, key, entry: CachedPage, generation: int):
+        if self.ttl <= 0 or generation != self.generation:
+            return
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def invalidate(self):
+        self.generation += 1
+        self.entries.clear()
+
+    def render(self, status_checks: List[dict], next_cursor: Optional[str]) -> CachedPage:
+        body = dumps(status_checks)
+        # X-Next-Cursor is part of the representation, so it is part of the tag
+        digest = hashlib.sha256(body)
+        digest.update(b"\n" + (next_cursor or "").encode())
+        etag = '"' + digest.hexdigest()[:32] + '"'
+        return CachedPage(body, etag, next_cursor, time.monotonic() + self.ttl)
+
+def page_response(page: CachedPage, request: Request) -> Response:
+    headers = {"ETag": page.etag, "Cache-Control": "no-cache"}
+    if page.next_cursor:
+        headers["X-Next-Cursor"] = page.next_cursor
+    if_none_match = request.headers.get("if-none-match", "")
+    # Weak comparison, since compressed responses carry the ETag as a weak validator
+    if if_none_match.strip() == "*" or page.etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(page.body, media_type="application/json", headers=headers)
+
+# Streaming (NDJSON) listing
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+STATUS_STREAM_BATCH_SIZE = int(os.environ.get('STATUS_STREAM_BATCH_SIZE', '500'))
+
+def wants_ndjson(request: Request, stream: bool) -> bool:
+    return stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+# Batch ingestion
+STATUS_BATCH_MAX = int(os.environ.get('STATUS_BATCH_MAX', '1000'))
+# Bounds the work done before the item count is known; 1 KiB per item by default
+STATUS_BATCH_MAX_BYTES = int(os.environ.get('STATUS_BATCH_MAX_BYTES', str(STATUS_BATCH_MAX * 1024)))
+
+def batch_too_large(limit: str):
+    raise HTTPException(status_code=413, detail=f"Batch exceeds {limit}")
+
+async def read_batch_body(request: Request) -> bytes:
+    # Refused up front when Content-Length is over the limit, and while
+    # reading when a chunked body grows past it
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > STATUS_BATCH_MAX_BYTES:
+        batch_too_large(f"{STATUS_BATCH_MAX_BYTES} bytes")
+    chunks, size = [], 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > STATUS_BATCH_MAX_BYTES:
+            batch_too_large(f"{STATUS_BATCH_MAX_BYTES} bytes")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+def parse_batch_body(body: bytes, content_type: str) -> list:
+    # Returns raw items; undecodable NDJSON lines are kept as exceptions.
+    # NDJSON lines are counted before any of them is decoded.
+    if NDJSON_MEDIA_TYPE in content_type:
+        lines = [line for line in body.splitlines() if line.strip()]
+        if len(lines) > STATUS_BATCH_MAX:
+            batch_too_large(f"{STATUS_BATCH_MAX} items")
+        items = []
+        for line in lines:
+            try:
+                items.append(json.loads(line))
+            except ValueError as e:
+                items.append(e)
+        return items
+    try:
+        items = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Request body must be a JSON array or NDJSON")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Request body must be a JSON array or NDJSON")
+    if len(items) > STATUS_BATCH_MAX:
+        batch_too_large(f"{STATUS_BATCH_MAX} items")
+    return items
+
+def build_batch(items: list):
+    results = []
+    status_docs = []
+    for index, item in enumerate(items):
+        try:
+            if isinstance(item, Exception):
+                raise item
+            if not isinstance(item, dict):
+                raise ValueError("Item must be a JSON object")
+            status_doc = new_status_doc(StatusCheckCreate(**item).client_name)
+        except (ValueError, ValidationError) as e:
+            results.append(StatusCheckBatchItem(index=index, error=str(e)))
+            continue
+        results.append(StatusCheckBatchItem(index=index, id=status_doc["id"]))
+        status_docs.append((index, status_doc))
+    return results, status_docs
+
+# Per-client rollups kept up to date on every write
+RollupGranularity = Literal["minute", "hour", "day"]
+ROLLUP_GRANULARITIES = {
+    "minute": lambda ts: ts.replace(second=0, microsecond=0),
+    "hour": lambda ts: ts.replace(minute=0, second=0, microsecond=0),
+    "day": lambda ts: ts.replace(hour=0, minute=0, second=0, microsecond=0),
+}
+ROLLUP_KEYS = ["granularity", "client_name", "bucket"]
+STATS_MAX_BUCKETS = int(os.environ.get('STATS_MAX_BUCKETS', '10000'))
+STATS_PROJECTION = {"_id": 0, "bucket": 1, "client_name": 1, "count": 1}
+STATS_SORT = [("bucket", 1), ("client_name", 1)]
+# The rebuild scans all of status_checks, so its route is only installed when
+# a token is set, and callers must send it in X-Rebuild-Token
+STATS_REBUILD_TOKEN = os.environ.get('STATS_REBUILD_TOKEN', '')
+
+def rollup_updates(status_docs: List[dict]) -> list:
+    counts = {}
+    for status_doc in status_docs:
+        for granularity, truncate in ROLLUP_GRANULARITIES.items():
+            key = (granularity, status_doc["client_name"], truncate(status_doc["timestamp"]))
+            counts[key] = counts.get(key, 0) + 1
+    if not counts:
+        return []
+    from pymongo import UpdateOne
+    return [
+        UpdateOne(dict(zip(ROLLUP_KEYS, key)), {"$inc": {"count": count}}, upsert=True)
+        for key, count in counts.items()
+    ]
+
+def rollup_pipeline(granularity: str) -> list:
+    # Recomputes one granularity from the raw collection (requires MongoDB 5.0+ for $dateTrunc)
+    return [
+        {"$group": {
+            "_id": {
+                "client_name": "$client_name",
+                "bucket": {"$dateTrunc": {"date": "$timestamp", "unit": granularity}},
+            },
+            "count": {"$sum": 1},
+        }},
+        {"$project": {
+            "_id": 0,
+            "granularity": {"$literal": granularity},
+            "client_name": "$_id.client_name",
+            "bucket": "$_id.bucket",
+            "count": 1,
+        }},
+        {"$merge": {"into": "status_rollups", "on": ROLLUP_KEYS, "whenMatched": "replace", "whenNotMatched": "insert"}},
+    ]
+
+def stats_filter(
+    granularity: str,
+    client_name: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> dict:
+    query = {"granularity": granularity}
+    if client_name:
+        query["client_name"] = client_name
+    since, until = to_naive_utc(since), to_naive_utc(until)
+    if since or until:
+        query["bucket"] = {}
+        if since:
+            query["bucket"]["$gte"] = ROLLUP_GRANULARITIES[granularity](since)
+        if until:
+            query["bucket"]["$lt"] = until
+    return query
+
+def check_rebuild_token(request: Request):
+    if not secrets.compare_digest(request.headers.get("x-rebuild-token", ""), STATS_REBUILD_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid rebuild token")
+
+def status_stats(granularity: str, buckets: List[dict]) -> StatusStats:
+    # Callers read STATS_MAX_BUCKETS + 1 buckets so a cut-off result is detected
+    truncated = len(buckets) > STATS_MAX_BUCKETS
+    buckets = buckets[:STATS_MAX_BUCKETS]
+    clients = {}
+    for bucket in buckets:
+        clients[bucket["client_name"]] = clients.get(bucket["client_name"], 0) + bucket["count"]
+    return StatusStats(
+        granularity=granularity,
+        total=sum(clients.values()),
+        clients=clients,
+        buckets=[StatusStatsBucket(**bucket) for bucket in buckets],
+        truncated=truncated,
+    )
+
+# Retention shared by both entry points: the TTL index. Archival and capped
+# mode need the long-running backend/server.py.
+STATUS_RETENTION = os.environ.get('STATUS_RETENTION', 'none')
+STATUS_RETENTION_DAYS = float(os.environ.get('STATUS_RETENTION_DAYS', '30'))
+TTL_INDEX = "timestamp_ttl"
+INDEX_OPTIONS_CONFLICT = 85
+INDEX_NOT_FOUND = 27
+DUPLICATE_KEY = 11000
+
+async def ensure_ttl_index(db):
+    from pymongo.errors import OperationFailure
+
+    expire_after = int(STATUS_RETENTION_DAYS * 86400)
+    try:
+        await db.status_checks.create_index([("timestamp", 1)], name=TTL_INDEX, expireAfterSeconds=expire_after)
+    except OperationFailure as e:
+        if e.code != INDEX_OPTIONS_CONFLICT:
+            raise
+        # The retention period changed; update the index in place
+        await db.command("collMod", "status_checks", index={"name": TTL_INDEX, "expireAfterSeconds": expire_after})
+
+async def drop_ttl_index(db):
+    # Retention was switched off, or to a mode that must not lose documents
+    # before it acts on them
+    from pymongo.errors import OperationFailure
+
+    try:
+        await db.status_checks.drop_index(TTL_INDEX)
+    except OperationFailure as e:
+        if e.code != INDEX_NOT_FOUND:
+            raise
+
+async def create_status_indexes(db) -> bool:
+    # create_index is a no-op when an identical index already exists, so the
+    # callers retry until every index is in place; returns whether they are
+    created = True
+    for name, keys, options in STATUS_INDEXES:
+        try:
+            await db.status_checks.create_index(keys, name=name, **options)
+        except Exception as e:
+            logger.warning(f"Index creation failed for {name}: {e}")
+            created = False
+    try:
+        await db.status_rollups.create_index([(key, 1) for key in ROLLUP_KEYS], name="rollup_key", unique=True)
+    except Exception as e:
+        logger.warning(f"Index creation failed for rollup_key: {e}")
+        created = False
+    return created
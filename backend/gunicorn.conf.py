@@ -0,0 +1,51 @@
+"""
+Gunicorn settings for running server.py in production:
+
+    gunicorn -c gunicorn.conf.py server:app
+
+Workers are uvicorn workers, which use uvloop and httptools when they are
+installed (uvicorn[standard]). Send SIGHUP for a graceful rolling restart,
+SIGTTIN/SIGTTOU to add or remove a worker at runtime.
+"""
+import multiprocessing
+import os
+
+from uvicorn.workers import UvicornWorker
+
+
+def env_flag(name: str, default: str = 'false') -> bool:
+    return os.environ.get(name, default).lower() in ('1', 'true', 'yes', 'on')
+
+
+class Worker(UvicornWorker):
+    CONFIG_KWARGS = {
+        **UvicornWorker.CONFIG_KWARGS,
+        "loop": os.environ.get('UVICORN_LOOP', 'auto'),
+        "http": os.environ.get('UVICORN_HTTP', 'auto'),
+    }
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY') or multiprocessing.cpu_count())
+worker_class = Worker
+
+# Import the app once in the master so workers fork with it loaded. The Mongo
+# client does not connect until first use, so nothing is shared across the fork.
+# With preloading, SIGHUP restarts workers but does not pick up new code.
+preload_app = env_flag('PRELOAD_APP', 'true')
+
+# Workers get this long to finish in-flight requests and drain the write-behind
+# buffer on restart or shutdown
+graceful_timeout = int(os.environ.get('GRACEFUL_TIMEOUT', '30'))
+timeout = int(os.environ.get('WORKER_TIMEOUT', '60'))
+keepalive = int(os.environ.get('KEEPALIVE', '5'))
+
+# Recycle workers after this many requests (0 disables), staggered by the jitter
+max_requests = int(os.environ.get('MAX_REQUESTS', '0'))
+max_requests_jitter = int(os.environ.get('MAX_REQUESTS_JITTER', '0'))
+
+# Requests are logged by server.py as JSON (ACCESS_LOG), so gunicorn's own access log stays off
+accesslog = None
+
+# server.py reads this to split MONGO_CONNECTION_BUDGET across the workers
+os.environ['WEB_CONCURRENCY'] = str(workers)
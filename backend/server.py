@@ -1,33 +1,413 @@
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
 import logging
+import logging.handlers
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List
-import uuid
-from datetime import datetime
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from typing import Dict, List, Literal, Optional
+import asyncio
+import atexit
+import cProfile
+import bisect
+import gzip
+import json
+import math
+import pstats
+import queue
+import random
+import re
+import secrets
+import sys
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
 
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-try:
-    mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
-    db_name = os.environ.get('DB_NAME', 'portfolio_dev')
-    client = AsyncIOMotorClient(mongo_url)
-    db = client[db_name]
-    mongo_available = True
-    print(f"Connected to MongoDB: {db_name}")
-except Exception as e:
-    print(f"MongoDB connection failed: {e}")
-    print("Running in development mode without database")
+# Shared with api/index.py. Imported once .env is loaded, since core reads its
+# settings at import time.
+from core import (  # noqa: E402
+    COMPRESSION, DUPLICATE_KEY, MONGO_BREAKER_FAILURES, MONGO_BREAKER_RESET_MS, MONGO_MAX_IDLE_TIME_MS,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS, MONGO_WAIT_QUEUE_TIMEOUT_MS, NDJSON_MEDIA_TYPE, ROLLUP_GRANULARITIES,
+    STATS_MAX_BUCKETS, STATS_PROJECTION, STATS_REBUILD_TOKEN, STATS_SORT, STATUS_CACHE_SIZE,
+    STATUS_CACHE_TTL_MS, STATUS_FIELDS, STATUS_PAGE_MAX, STATUS_PAGE_SIZE, STATUS_PROJECTION,
+    STATUS_RETENTION, STATUS_RETENTION_DAYS, STATUS_SORT, STATUS_STREAM_BATCH_SIZE, CachedPage,
+    CircuitBreaker, CompressionMiddleware, Metrics, MetricsMiddleware, MetricsText, MongoOpRecorder,
+    RequestTiming, ResponseCache, RollupGranularity, StatusCheck, StatusCheckBatchItem,
+    StatusCheckBatchResult, StatusCheckCreate, StatusQuery, StatusStats, build_batch, check_rebuild_token,
+    create_pool_stats, create_status_indexes, decode_cursor, drop_ttl_index, dumps, encode_cursor,
+    ensure_ttl_index, env_flag, explain_summary, is_connection_error, mongo_pool_options, new_status_doc,
+    page_response, parse_batch_body, read_batch_body, request_timing, rollup_pipeline, rollup_updates,
+    stats_filter, status_filter, status_query, status_stats, wants_ndjson,
+)
+
+# Configure logging. Records are put on a queue and written by a QueueListener
+# thread, so the event loop never blocks on stderr. Access log lines are JSON.
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+ACCESS_LOG = env_flag('ACCESS_LOG', 'true')
+ACCESS_LOG_SAMPLE_RATE = float(os.environ.get('ACCESS_LOG_SAMPLE_RATE', '1.0'))
+ACCESS_LOG_SLOW_MS = float(os.environ.get('ACCESS_LOG_SLOW_MS', '500'))
+
+class LogFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        if record.name == "access":
+            return record.getMessage()
+        return super().format(record)
+
+log_queue = queue.SimpleQueue()
+log_queue_handler = logging.handlers.QueueHandler(log_queue)
+# Records are formatted by log_output in the listener thread
+log_queue_handler.setFormatter(logging.Formatter('%(message)s'))
+log_output = logging.StreamHandler(sys.stderr)
+log_output.setFormatter(LogFormatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+log_listener = None
+
+def start_log_listener():
+    global log_listener
+    log_listener = logging.handlers.QueueListener(log_queue, log_output)
+    log_listener.start()
+
+def stop_log_listener():
+    # Writes out whatever is still queued
+    if log_listener is not None:
+        log_listener.stop()
+
+def route_server_logs():
+    # uvicorn and gunicorn install their own stream handlers; send their records,
+    # access logs included, through the queue as well, and drop uvicorn's access
+    # log when ours is on
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access", "gunicorn.error", "gunicorn.access"):
+        server_logger = logging.getLogger(name)
+        if server_logger.handlers:
+            server_logger.handlers = [log_queue_handler]
+    if ACCESS_LOG:
+        logging.getLogger("uvicorn.access").disabled = True
+
+logging.basicConfig(level=LOG_LEVEL, handlers=[log_queue_handler])
+start_log_listener()
+# Forked workers (gunicorn --preload) do not inherit the listener thread
+os.register_at_fork(after_in_child=start_log_listener)
+atexit.register(stop_log_listener)
+logger = logging.getLogger(__name__)
+access_logger = logging.getLogger("access")
+
+# Circuit breaker in front of MongoDB; its settings are read in core.py
+mongo_breaker = CircuitBreaker(MONGO_BREAKER_FAILURES, MONGO_BREAKER_RESET_MS)
+
+# Request and MongoDB metrics, exported in Prometheus text format at /metrics;
+# the series shared with api/index.py are defined in core.Metrics
+class StatusMetrics(Metrics):
+    def __init__(self):
+        super().__init__()
+        self.admission_rejections = {}
+        self.read_flights = {}
+        self.archive_runs = {}
+        self.archived_documents = {}
+        self.archive_last_run_documents = 0
+        self.journal_writes = {}
+        self.journal_replayed = 0
+        self.journal_depth = 0
+        self.journal_bytes = 0
+
+    def observe_rejection(self, route: str, reason: str):
+        key = (route, reason)
+        self.admission_rejections[key] = self.admission_rejections.get(key, 0) + 1
+
+    def observe_flight(self, route: str, role: str):
+        key = (route, role)
+        self.read_flights[key] = self.read_flights.get(key, 0) + 1
+
+    def observe_archive(self, target: str, documents: int, failed: bool):
+        key = ("failed" if failed else "ok",)
+        self.archive_runs[key] = self.archive_runs.get(key, 0) + 1
+        self.archived_documents[(target,)] = self.archived_documents.get((target,), 0) + documents
+        self.archive_last_run_documents = documents
+
+    def observe_journal_write(self, reason: str, documents: int, depth: int, size: int):
+        key = (reason,)
+        self.journal_writes[key] = self.journal_writes.get(key, 0) + documents
+        self.journal_depth = depth
+        self.journal_bytes = size
+
+    def observe_journal_replay(self, documents: int, depth: int, size: int):
+        self.journal_replayed += documents
+        self.journal_depth = depth
+        self.journal_bytes = size
+
+    def write(self, out: MetricsText):
+        super().write(out)
+        out.counter("admission_rejections_total", "Requests shed by admission control.",
+                    self.admission_rejections, ("route", "reason"))
+        out.counter("read_flights_total", "Reads that ran a query (leader) or shared one already in flight (coalesced).",
+                    self.read_flights, ("route", "role"))
+        out.counter("status_archive_runs_total", "Archival runs by outcome.", self.archive_runs, ("outcome",))
+        out.counter("status_archived_documents_total", "Status checks moved out of status_checks by archival.",
+                    self.archived_documents, ("target",))
+        out.value("status_archive_last_run_documents", "Status checks archived by the last archival run.", "gauge",
+                  self.archive_last_run_documents)
+        out.counter("status_journal_writes_total", "Status checks written to the local journal instead of MongoDB.",
+                    self.journal_writes, ("reason",))
+        out.value("status_journal_replayed_total", "Journaled status checks replayed into MongoDB.", "counter",
+                  self.journal_replayed)
+        out.value("status_journal_depth", "Journaled status checks waiting to be replayed.", "gauge", self.journal_depth)
+        out.value("status_journal_bytes", "Bytes of the journal waiting to be replayed.", "gauge", self.journal_bytes)
+
+metrics = StatusMetrics()
+mongo_op = MongoOpRecorder(mongo_breaker, metrics)
+
+class AccessLogMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not ACCESS_LOG:
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        timing = RequestTiming()
+        token = request_timing.set(timing)
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_timing.reset(token)
+            duration_ms = (time.perf_counter() - started) * 1000
+            # Errors and slow requests are always logged; the rest are sampled
+            if status >= 400 or duration_ms >= ACCESS_LOG_SLOW_MS or random.random() < ACCESS_LOG_SAMPLE_RATE:
+                client = scope.get("client")
+                access_logger.info(dumps({
+                    "time": datetime.now(timezone.utc),
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": getattr(scope.get("route"), "path", None),
+                    "status": status,
+                    "bytes": size,
+                    "duration_ms": round(duration_ms, 3),
+                    "db_ms": round(timing.db_seconds * 1000, 3),
+                    "db_operations": timing.db_operations,
+                    "client": client[0] if client else None,
+                }).decode())
+
+# Opt-in profiling of single requests. With PROFILING off the middleware is not
+# installed at all. When on, a request is profiled if it carries X-Profile (equal
+# to PROFILE_TOKEN when one is set) or is picked by PROFILE_SAMPLE_RATE. The
+# profiler sees the whole event loop thread, so work from concurrent requests
+# shows up too; only one request is profiled at a time.
+PROFILING = env_flag('PROFILING')
+PROFILE_TOKEN = os.environ.get('PROFILE_TOKEN', '')
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_DIR = Path(os.environ.get('PROFILE_DIR', str(ROOT_DIR / 'profiles')))
+PROFILE_KEEP = int(os.environ.get('PROFILE_KEEP', '50'))
+PROFILE_TOP_FUNCTIONS = 25
+PROFILE_ID_PATTERN = re.compile(r"^[0-9T]+-[A-Z]+-[0-9a-f]+$")
+
+def profile_requested(scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == b"x-profile":
+            return not PROFILE_TOKEN or secrets.compare_digest(value.decode("latin-1"), PROFILE_TOKEN)
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+def save_profile(profiler: cProfile.Profile, summary: dict):
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    profiler.dump_stats(PROFILE_DIR / f"{summary['id']}.prof")
+    stats = pstats.Stats(profiler).stats
+    slowest = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:PROFILE_TOP_FUNCTIONS]
+    summary["functions"] = [
+        {
+            "function": pstats.func_std_string(function),
+            "calls": calls,
+            "own_ms": round(own * 1000, 3),
+            "cumulative_ms": round(cumulative * 1000, 3),
+        }
+        for function, (_, calls, own, cumulative, _) in slowest
+    ]
+    (PROFILE_DIR / f"{summary['id']}.json").write_bytes(dumps(summary))
+    # Ids start with the capture time, so sorting by name sorts by age
+    captures = sorted(PROFILE_DIR.glob("*.json"))
+    for old in captures[:max(0, len(captures) - PROFILE_KEEP)]:
+        old.unlink(missing_ok=True)
+        old.with_suffix(".prof").unlink(missing_ok=True)
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+        self.active = False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.active or not profile_requested(scope):
+            await self.app(scope, receive, send)
+            return
+        self.active = True
+        profile_id = f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{scope['method']}-{secrets.token_hex(4)}"
+        timing = request_timing.get()
+        token = None
+        if timing is None:
+            timing = RequestTiming()
+            token = request_timing.set(timing)
+        db_seconds = timing.db_seconds
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]}
+            await send(message)
+
+        profiler = cProfile.Profile()
+        started, cpu_started = time.perf_counter(), time.thread_time()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            wall = time.perf_counter() - started
+            cpu = time.thread_time() - cpu_started
+            db_wait = timing.db_seconds - db_seconds
+            if token is not None:
+                request_timing.reset(token)
+            summary = {
+                "id": profile_id,
+                "time": datetime.now(timezone.utc),
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": getattr(scope.get("route"), "path", None),
+                "status": status,
+                "wall_ms": round(wall * 1000, 3),
+                "cpu_ms": round(cpu * 1000, 3),
+                "db_wait_ms": round(db_wait * 1000, 3),
+                # Time neither on CPU nor inside a MongoDB call: other I/O and
+                # waiting for the event loop to get back to this request
+                "other_wait_ms": round(max(0.0, wall - cpu - db_wait) * 1000, 3),
+            }
+            try:
+                await asyncio.to_thread(save_profile, profiler, summary)
+            except Exception as e:
+                logger.error(f"Saving profile {profile_id} failed: {e}")
+            finally:
+                self.active = False
+
+# Connection pool size per process. MONGO_CONNECTION_BUDGET is the total for
+# the deployment and is split evenly across the WEB_CONCURRENCY workers;
+# MONGO_MAX_POOL_SIZE sets the per-process size directly.
+WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', '1'))
+MONGO_CONNECTION_BUDGET = int(os.environ.get('MONGO_CONNECTION_BUDGET', '0'))
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', '0')) or (
+    max(1, MONGO_CONNECTION_BUDGET // WEB_CONCURRENCY) if MONGO_CONNECTION_BUDGET else 100
+)
+# Connections kept open even when idle; they are opened by the warm-up at startup
+MONGO_MIN_POOL_SIZE = min(int(os.environ.get('MONGO_MIN_POOL_SIZE', '10')), MONGO_MAX_POOL_SIZE)
+MONGO_WARMUP = env_flag('MONGO_WARMUP', 'true')
+
+mongo_pool_stats = create_pool_stats()
+metrics.pool_stats = mongo_pool_stats
+
+# Where status checks are stored: 'mongo', or 'embedded' for the in-process
+# append-only log (EmbeddedStatusStore), which needs no MongoDB at all
+STORAGE_ENGINE = os.environ.get('STORAGE_ENGINE', 'mongo')
+
+# MongoDB connection. motor connects lazily, so reachability is tracked by
+# the health monitor and the circuit breaker rather than here. That also keeps
+# the client fork-safe when the app is preloaded before workers are forked.
+if STORAGE_ENGINE == 'embedded':
+    logger.info("Using the embedded storage engine; MongoDB is not used")
     mongo_available = False
     client = None
     db = None
+else:
+    try:
+        mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+        db_name = os.environ.get('DB_NAME', 'portfolio_dev')
+        client = AsyncIOMotorClient(
+            mongo_url,
+            serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            event_listeners=[mongo_pool_stats],
+            **mongo_pool_options(MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE),
+        )
+        db = client[db_name]
+        mongo_available = True
+        logger.info(f"MongoDB client configured for: {db_name}")
+    except Exception as e:
+        logger.error(f"MongoDB connection failed: {e}")
+        logger.warning("Running in development mode without database")
+        mongo_available = False
+        client = None
+        db = None
+
+def db_available() -> bool:
+    # False when running without a database; raises 503 while the circuit is open
+    if not mongo_available or db is None:
+        return False
+    mongo_breaker.check()
+    return True
+
+# Background health monitor; its pings double as half-open probes
+MONGO_HEALTH_INTERVAL_MS = int(os.environ.get('MONGO_HEALTH_INTERVAL_MS', '5000'))
+mongo_health = {"last_ping_ms": None, "last_ping_at": None, "warmed_up": False}
+mongo_monitor_task = None
+
+async def ping_mongo() -> bool:
+    started = time.perf_counter()
+    try:
+        with mongo_op("ping"):
+            await db.command("ping")
+    except Exception:
+        return False
+    mongo_health["last_ping_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    mongo_health["last_ping_at"] = datetime.utcnow()
+    return True
+
+async def warm_up_mongo():
+    # Concurrent pings check out MONGO_MIN_POOL_SIZE connections at once, so
+    # server discovery and connection setup are done before /api/ready passes
+    started = time.perf_counter()
+    pings = max(1, MONGO_MIN_POOL_SIZE) if MONGO_WARMUP else 1
+    if all(await asyncio.gather(*(ping_mongo() for _ in range(pings)))):
+        mongo_health["warmed_up"] = True
+        logger.info(
+            f"MongoDB pool warmed up with {mongo_pool_stats.snapshot()['open']} connections "
+            f"in {(time.perf_counter() - started) * 1000:.1f} ms"
+        )
+
+async def monitor_mongo():
+    global status_index_task
+    while True:
+        if mongo_health["warmed_up"]:
+            await ping_mongo()
+        else:
+            await warm_up_mongo()
+        # Index setup that failed, e.g. because MongoDB was down at startup,
+        # is retried once the database answers again
+        if (
+            not indexes_ready
+            and mongo_health["warmed_up"]
+            and mongo_breaker.state == "closed"
+            and (status_index_task is None or status_index_task.done())
+        ):
+            status_index_task = asyncio.create_task(ensure_status_indexes())
+        await asyncio.sleep(MONGO_HEALTH_INTERVAL_MS / 1000)
 
 # Create the main app without a prefix
 app = FastAPI()
@@ -36,14 +416,1117 @@ app = FastAPI()
 api_router = APIRouter(prefix="/api")
 
 
-# Define Models
-class StatusCheck(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    client_name: str
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+async def explain_status_query(status_query: StatusQuery, limit: int) -> dict:
+    if not db_available():
+        raise HTTPException(status_code=503, detail="Database is not available")
+    query = status_filter(status_query)
+    with mongo_op("explain"):
+        cursor = db.status_checks.find(query, STATUS_PROJECTION).sort(STATUS_SORT).limit(limit + 1)
+        explanation = await cursor.explain()
+    return explain_summary(query, explanation)
+
+# Storage engines for status checks. Both keep the same (timestamp, id) order,
+# filters and millisecond timestamp precision, so the routes do not care which
+# one is in use. insert returns per-document write errors by index, in the
+# shape of MongoDB's writeErrors, and raises when nothing could be written.
+EMBEDDED_STORE_PATH = Path(os.environ.get('EMBEDDED_STORE_PATH', str(ROOT_DIR / 'data' / 'status_checks.log')))
+# How often the log is fsynced; 0 fsyncs every write before it is acknowledged
+EMBEDDED_FSYNC_MS = int(os.environ.get('EMBEDDED_FSYNC_MS', '1000'))
+
+class MongoStatusStore:
+    name = "mongo"
+
+    @property
+    def configured(self) -> bool:
+        return mongo_available and db is not None
+
+    def available(self) -> bool:
+        return db_available()
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def insert(self, status_docs: List[dict]) -> Dict[int, dict]:
+        try:
+            if len(status_docs) == 1:
+                with mongo_op("insert_one") as op:
+                    op.documents = 1
+                    await db.status_checks.insert_one(status_docs[0])
+            else:
+                # Unordered so one bad document does not stop the rest
+                with mongo_op("insert_many") as op:
+                    op.documents = len(status_docs)
+                    await db.status_checks.insert_many(status_docs, ordered=False)
+        except DuplicateKeyError as e:
+            return {0: {"index": 0, "code": e.code, "errmsg": str(e)}}
+        except BulkWriteError as e:
+            return {write_error["index"]: write_error for write_error in e.details.get("writeErrors", [])}
+        return {}
+
+    async def find(self, query: StatusQuery, limit: int, operation: str = "find") -> List[dict]:
+        cursor = db.status_checks.find(status_filter(query), STATUS_PROJECTION).sort(STATUS_SORT).limit(limit)
+        with mongo_op(operation) as op:
+            status_checks = await cursor.to_list(limit)
+            op.documents = len(status_checks)
+        return status_checks
+
+    async def scan(self, query: StatusQuery, limit: Optional[int], batch_size: int, operation: str):
+        # Yields lists of up to batch_size status checks
+        cursor = db.status_checks.find(status_filter(query), STATUS_PROJECTION).sort(STATUS_SORT).batch_size(batch_size)
+        if limit:
+            cursor = cursor.limit(limit)
+        with mongo_op(operation) as op:
+            while True:
+                status_checks = await cursor.to_list(batch_size)
+                if not status_checks:
+                    break
+                op.documents += len(status_checks)
+                yield status_checks
+
+class EmbeddedStatusStore:
+    # Status checks are appended to a log of JSON lines and indexed in memory:
+    # by id for uniqueness, and as sorted (timestamp, id) keys overall and per
+    # client_name, so every filter is a pair of binary searches. The log is
+    # replayed on startup and locked, so only one process can use it; run a
+    # single worker (WEB_CONCURRENCY=1). Rollups, explain, change streams and
+    # retention are MongoDB features and are not available with this engine.
+    name = "embedded"
+    configured = True
+
+    def __init__(self, path: Path, fsync_ms: int):
+        self.path = path
+        self.fsync_interval = fsync_ms / 1000
+        self.file = None
+        self.documents = {}
+        self.keys = []
+        self.client_keys = {}
+        self.dirty = False
+        self.fsync_task = None
+
+    def available(self) -> bool:
+        return self.file is not None
+
+    async def open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(self.path, "ab+", buffering=0)
+        if fcntl is not None:
+            try:
+                fcntl.flock(self.file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                self.file.close()
+                self.file = None
+                raise RuntimeError(f"{self.path} is locked by another process; the embedded engine needs a single worker")
+        await asyncio.to_thread(self.replay)
+        logger.info(f"Embedded store loaded {len(self.documents)} status checks from {self.path}")
+        if self.fsync_interval > 0:
+            self.fsync_task = asyncio.create_task(self.sync_periodically())
+
+    def replay(self):
+        self.file.seek(0)
+        data = self.file.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            # A write cut short by a crash; drop the partial line
+            logger.warning(f"Truncating {len(data) - end} bytes of an incomplete record in {self.path}")
+            self.file.truncate(end)
+        skipped = 0
+        for line in data[:end].splitlines():
+            try:
+                status_doc = json.loads(line)
+                status_doc["timestamp"] = datetime.fromisoformat(status_doc["timestamp"])
+            except (ValueError, KeyError, TypeError):
+                skipped += 1
+                continue
+            if status_doc["id"] not in self.documents:
+                self.documents[status_doc["id"]] = status_doc
+                self.keys.append((status_doc["timestamp"], status_doc["id"]))
+                self.client_keys.setdefault(status_doc["client_name"], []).append((status_doc["timestamp"], status_doc["id"]))
+        if skipped:
+            logger.warning(f"Skipped {skipped} unreadable records in {self.path}")
+        self.keys.sort()
+        for keys in self.client_keys.values():
+            keys.sort()
+
+    async def sync_periodically(self):
+        while True:
+            await asyncio.sleep(self.fsync_interval)
+            await self.sync()
+
+    async def sync(self):
+        if self.dirty and self.file is not None:
+            self.dirty = False
+            await asyncio.to_thread(os.fsync, self.file.fileno())
+
+    async def close(self):
+        if self.fsync_task is not None:
+            self.fsync_task.cancel()
+        if self.file is not None:
+            await self.sync()
+            self.file.close()
+            self.file = None
+
+    @staticmethod
+    def add_key(keys: list, key: tuple):
+        # New status checks almost always sort last
+        if not keys or key > keys[-1]:
+            keys.append(key)
+        else:
+            bisect.insort(keys, key)
+
+    async def insert(self, status_docs: List[dict]) -> Dict[int, dict]:
+        errors = {}
+        stored = {}
+        for index, status_doc in enumerate(status_docs):
+            if status_doc["id"] in self.documents or status_doc["id"] in stored:
+                errors[index] = {
+                    "index": index,
+                    "code": DUPLICATE_KEY,
+                    "errmsg": f"Duplicate key error: id {status_doc['id']} already exists",
+                }
+                continue
+            timestamp = status_doc["timestamp"]
+            status_doc = {
+                "id": status_doc["id"],
+                "client_name": status_doc["client_name"],
+                # Same precision as a BSON date
+                "timestamp": timestamp.replace(microsecond=timestamp.microsecond // 1000 * 1000),
+            }
+            stored[status_doc["id"]] = status_doc
+        if stored:
+            # One write per call, so a batch is never interleaved with another;
+            # nothing is indexed unless the write succeeded
+            self.file.write(b"".join(dumps(status_doc) + b"\n" for status_doc in stored.values()))
+            self.documents.update(stored)
+            for status_doc in stored.values():
+                key = (status_doc["timestamp"], status_doc["id"])
+                self.add_key(self.keys, key)
+                self.add_key(self.client_keys.setdefault(status_doc["client_name"], []), key)
+            self.dirty = True
+            if self.fsync_interval <= 0:
+                await self.sync()
+        return errors
+
+    def key_range(self, query: StatusQuery, start: Optional[tuple] = None):
+        keys = self.client_keys.get(query.client_name, []) if query.client_name else self.keys
+        lo, hi = 0, len(keys)
+        if query.since:
+            lo = bisect.bisect_left(keys, (query.since,))
+        for after in (query.after, start):
+            if after:
+                lo = max(lo, bisect.bisect_right(keys, after))
+        if query.until:
+            hi = bisect.bisect_left(keys, (query.until,))
+        return keys, lo, hi
+
+    def read(self, query: StatusQuery, limit: int, start: Optional[tuple] = None) -> List[dict]:
+        # Stored documents are shared, not copied; callers only serialize them
+        keys, lo, hi = self.key_range(query, start)
+        return [self.documents[status_id] for _, status_id in keys[lo:min(hi, lo + limit)]]
+
+    async def find(self, query: StatusQuery, limit: int, operation: str = "find") -> List[dict]:
+        return self.read(query, limit)
+
+    async def scan(self, query: StatusQuery, limit: Optional[int], batch_size: int, operation: str):
+        # Each chunk resumes after the last key, so concurrent inserts are safe
+        remaining = limit or math.inf
+        start = None
+        while remaining > 0:
+            status_checks = self.read(query, min(batch_size, remaining), start)
+            if not status_checks:
+                break
+            remaining -= len(status_checks)
+            start = (status_checks[-1]["timestamp"], status_checks[-1]["id"])
+            yield status_checks
+
+def create_status_store():
+    if STORAGE_ENGINE == 'embedded':
+        return EmbeddedStatusStore(EMBEDDED_STORE_PATH, EMBEDDED_FSYNC_MS)
+    return MongoStatusStore()
+
+status_store = create_status_store()
+
+# Read cache for GET /api/status pages, invalidated on every write
+status_cache = ResponseCache(STATUS_CACHE_TTL_MS, STATUS_CACHE_SIZE)
+
+async def load_status_page(query: StatusQuery, limit: int):
+    if not status_store.available():
+        return [], None
+    # Fetch one extra document to know whether another page exists
+    status_checks = await status_store.find(query, limit + 1)
+    next_cursor = None
+    if len(status_checks) > limit:
+        status_checks = status_checks[:limit]
+        next_cursor = encode_cursor(status_checks[-1])
+    return status_checks, next_cursor
+
+# Single-flight for cache misses: concurrent identical reads share one query
+# and one rendered body instead of each going to MongoDB
+STATUS_SINGLE_FLIGHT = env_flag('STATUS_SINGLE_FLIGHT', 'true')
+
+class SingleFlight:
+    def __init__(self, route: str):
+        self.route = route
+        self.calls = {}
+
+    async def do(self, key, load):
+        if not STATUS_SINGLE_FLIGHT:
+            return await load()
+        task = self.calls.get(key)
+        if task is None:
+            # A task of its own, so a disconnecting leader does not cancel the followers
+            task = self.calls[key] = asyncio.ensure_future(load())
+            task.add_done_callback(lambda done: self.forget(key, done))
+            metrics.observe_flight(self.route, "leader")
+        else:
+            metrics.observe_flight(self.route, "coalesced")
+        return await asyncio.shield(task)
+
+    def forget(self, key, task):
+        if self.calls.get(key) is task:
+            del self.calls[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved when every waiter has gone away
+            task.exception()
+
+status_reads = SingleFlight("/api/status")
+
+async def load_cached_page(key, query: StatusQuery, limit: int, generation: int) -> CachedPage:
+    status_checks, next_cursor = await load_status_page(query, limit)
+    page = status_cache.render(status_checks, next_cursor)
+    status_cache.set(key, page, generation)
+    return page
+
+# Streaming (NDJSON) listing
+async def stream_status_checks(query: StatusQuery, limit: Optional[int]):
+    # Availability is checked by the caller before the response starts
+    try:
+        async for status_checks in status_store.scan(query, limit, STATUS_STREAM_BATCH_SIZE, "find_stream"):
+            yield b"".join(dumps(status_check) + b"\n" for status_check in status_checks)
+    except Exception as e:
+        # Headers are already sent, so the stream just ends early
+        logger.error(f"Database error while streaming status checks: {e}")
+
+# Bulk export as CSV or Parquet. The cursor is read in chunks that are turned
+# into columns and encoded off the event loop, so memory stays bounded by
+# STATUS_EXPORT_BATCH_SIZE whatever the size of the export.
+STATUS_EXPORT_BATCH_SIZE = int(os.environ.get('STATUS_EXPORT_BATCH_SIZE', '50000'))
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+ExportFormat = Literal["csv", "parquet"]
+
+class ExportSink:
+    # Write-only file for pyarrow that hands out what was written since the last
+    # drain while still reporting the absolute position Parquet offsets need
+    closed = False
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+class ExportEncoder:
+    def __init__(self, format: str):
+        import pandas
+        import pyarrow
+
+        self.pandas = pandas
+        self.pyarrow = pyarrow
+        self.format = format
+        self.sink = ExportSink()
+        output = pyarrow.PythonFile(self.sink, mode="w")
+        if format == "csv":
+            import pyarrow.compute
+            import pyarrow.csv
+
+            # Timestamps become ISO 8601 strings, formatted exactly as the JSON API does
+            self.schema = pyarrow.schema([
+                ("id", pyarrow.string()),
+                ("client_name", pyarrow.string()),
+                ("timestamp", pyarrow.string()),
+            ])
+            self.writer = pyarrow.csv.CSVWriter(output, self.schema)
+        else:
+            import pyarrow.parquet
+
+            # Mongo keeps millisecond precision
+            self.schema = pyarrow.schema([
+                ("id", pyarrow.string()),
+                ("client_name", pyarrow.string()),
+                ("timestamp", pyarrow.timestamp("ms")),
+            ])
+            self.writer = pyarrow.parquet.ParquetWriter(output, self.schema)
+
+    def encode(self, columns: dict) -> bytes:
+        if self.format == "csv":
+            timestamps = self.iso_timestamps(columns["timestamp"])
+        else:
+            timestamps = self.pyarrow.array(self.pandas.to_datetime(columns["timestamp"]).values.astype("datetime64[ms]"))
+        arrays = [
+            self.pyarrow.array(columns["id"]),
+            self.pyarrow.array(columns["client_name"]),
+            timestamps,
+        ]
+        table = self.pyarrow.Table.from_arrays(arrays, schema=self.schema)
+        # One CSV block or Parquet row group per chunk
+        self.writer.write_table(table)
+        return self.sink.drain()
+
+    def iso_timestamps(self, timestamps: list):
+        # Matches datetime.isoformat(): %S on microsecond timestamps carries a
+        # six digit fraction, which isoformat leaves off on whole seconds
+        compute = self.pyarrow.compute
+        timestamps = self.pyarrow.array(timestamps, self.pyarrow.timestamp("us"))
+        formatted = compute.strftime(timestamps, "%Y-%m-%dT%H:%M:%S")
+        whole_seconds = compute.equal(compute.subsecond(timestamps), 0)
+        return compute.if_else(whole_seconds, compute.utf8_slice_codeunits(formatted, 0, 19), formatted)
+
+    def close(self) -> bytes:
+        self.writer.close()
+        return self.sink.drain()
+
+def export_encoder(format: str) -> ExportEncoder:
+    try:
+        return ExportEncoder(format)
+    except ImportError as e:
+        raise HTTPException(status_code=501, detail=f"{format} export is not available: {e}")
+
+async def export_status_checks(query: StatusQuery, limit: Optional[int], encoder):
+    # Availability is checked by the caller before the response starts
+    try:
+        async for status_checks in status_store.scan(query, limit, STATUS_EXPORT_BATCH_SIZE, "find_export"):
+            columns = {field: [doc[field] for doc in status_checks] for field in STATUS_FIELDS}
+            del status_checks
+            yield await asyncio.to_thread(encoder.encode, columns)
+        yield await asyncio.to_thread(encoder.close)
+    except Exception as e:
+        # Re-raised so the transfer is aborted instead of ending like a complete file
+        logger.error(f"Database error while exporting status checks: {e}")
+        raise
+
+# Per-client rollups kept up to date on every write
+async def record_rollups(status_docs: List[dict]):
+    updates = rollup_updates(status_docs)
+    # Rollups live in MongoDB, so there are none with the embedded engine
+    if not updates or not mongo_available:
+        return
+    try:
+        with mongo_op("bulk_write") as op:
+            op.documents = len(updates)
+            await db.status_rollups.bulk_write(updates, ordered=False)
+    except Exception as e:
+        # Counts drift until the next rebuild; the status checks themselves are stored
+        logger.error(f"Rollup update failed: {e}")
+
+async def rebuild_rollups(granularity: str):
+    await db.status_checks.aggregate(rollup_pipeline(granularity)).to_list(None)
+
+# Local write journal for database outages. Status checks MongoDB cannot take
+# (circuit open, connection errors, or no answer within
+# STATUS_JOURNAL_DEADLINE_MS) are appended to a journal file and acknowledged
+# once it is fsynced, which happens for all pending appends every
+# STATUS_JOURNAL_FSYNC_MS. A background task replays the journal in
+# insert_many batches when the database is back. A status check that already
+# made it in (an insert that timed out but landed) is a duplicate key error on
+# the unique id index; it is not inserted again, but its rollups and feed event
+# still follow, since nothing recorded them when it landed. Replay progress is
+# saved next to the journal after every batch, so a restart resumes where the
+# last replay stopped instead of counting those status checks twice. While
+# anything is left to replay, new writes go to the journal as well, which keeps
+# their order and their latency flat.
+# Each worker locks a journal file of its own, and drains journals left by
+# workers that are gone.
+STATUS_JOURNAL = env_flag('STATUS_JOURNAL')
+STATUS_JOURNAL_DIR = Path(os.environ.get('STATUS_JOURNAL_DIR', str(ROOT_DIR / 'data' / 'journal')))
+STATUS_JOURNAL_MAX_MB = float(os.environ.get('STATUS_JOURNAL_MAX_MB', '64'))
+STATUS_JOURNAL_FSYNC_MS = int(os.environ.get('STATUS_JOURNAL_FSYNC_MS', '10'))
+STATUS_JOURNAL_DEADLINE_MS = int(os.environ.get('STATUS_JOURNAL_DEADLINE_MS', '250'))
+STATUS_JOURNAL_REPLAY_BATCH_SIZE = int(os.environ.get('STATUS_JOURNAL_REPLAY_BATCH_SIZE', '500'))
+STATUS_JOURNAL_REPLAY_INTERVAL_MS = int(os.environ.get('STATUS_JOURNAL_REPLAY_INTERVAL_MS', '1000'))
+JOURNAL_READ_BYTES = 1 << 20
+
+class StatusJournal:
+    def __init__(self, path: Path, max_bytes: int, fsync_ms: int):
+        self.path = path
+        self.offset_path = path.with_suffix(".offset")
+        self.max_bytes = max_bytes
+        self.fsync_interval = fsync_ms / 1000
+        self.file = None
+        self.size = 0
+        self.offset = 0
+        self.depth = 0
+        self.sync_waiters = []
+        self.sync_task = None
+
+    def try_open(self) -> bool:
+        # False when another worker holds the file
+        file = open(self.path, "ab+", buffering=0)
+        if fcntl is not None:
+            try:
+                fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                file.close()
+                return False
+        try:
+            # A worker that drained the file may have unlinked it before we locked it
+            if os.stat(self.path).st_ino != os.fstat(file.fileno()).st_ino:
+                file.close()
+                return False
+        except FileNotFoundError:
+            file.close()
+            return False
+        self.file = file
+        data = os.pread(file.fileno(), os.fstat(file.fileno()).st_size, 0)
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            # An append cut short by a crash was never acknowledged
+            logger.warning(f"Truncating {len(data) - end} bytes of an incomplete record in {self.path}")
+            file.truncate(end)
+        self.size = end
+        self.offset = self.saved_offset()
+        if self.offset > end:
+            # Stale: the file was truncated after a full replay
+            self.offset = 0
+        self.depth = data.count(b"\n", self.offset, end)
+        return True
+
+    def saved_offset(self) -> int:
+        try:
+            return int(self.offset_path.read_text())
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def save_offset(self):
+        # Replaced whole so a crash leaves either the old offset or the new one
+        temp_path = self.offset_path.with_suffix(".offset.tmp")
+        temp_path.write_text(str(self.offset))
+        os.replace(temp_path, self.offset_path)
+
+    async def append(self, status_docs: List[dict], reason: str) -> Dict[int, dict]:
+        # Returns write errors by index, in the shape status_store.insert uses,
+        # for status checks too large to journal; replay reads at most
+        # JOURNAL_READ_BYTES at a time
+        records, write_errors = [], {}
+        for index, doc in enumerate(status_docs):
+            record = dumps({field: doc[field] for field in STATUS_FIELDS}) + b"\n"
+            if len(record) > JOURNAL_READ_BYTES:
+                write_errors[index] = {"index": index, "errmsg": "Status check is too large to journal"}
+            else:
+                records.append(record)
+        if not records:
+            return write_errors
+        data = b"".join(records)
+        # Bounded by what is left to replay; the file itself only shrinks once drained
+        if self.size - self.offset + len(data) > self.max_bytes:
+            logger.error(f"Write journal {self.path} is full, rejecting {len(status_docs)} status checks")
+            raise HTTPException(status_code=503, detail="Write journal is full", headers={"Retry-After": "5"})
+        try:
+            written = self.file.write(data)
+            if written != len(data):
+                raise OSError(f"short write of {written} of {len(data)} bytes")
+        except OSError as e:
+            # Cut back to the last whole record (e.g. after ENOSPC) so the
+            # next append does not extend a partial line
+            logger.error(f"Append to write journal {self.path} failed: {e}")
+            try:
+                self.file.truncate(self.size)
+            except OSError as e:
+                logger.error(f"Truncating write journal {self.path} failed: {e}")
+            raise HTTPException(status_code=503, detail="Write journal is not available", headers={"Retry-After": "5"})
+        self.size += len(data)
+        self.depth += len(records)
+        metrics.observe_journal_write(reason, len(records), self.depth, self.size - self.offset)
+        # Group commit: every append waiting on the same fsync is acknowledged by it
+        waiter = asyncio.get_running_loop().create_future()
+        self.sync_waiters.append(waiter)
+        if self.sync_task is None:
+            self.sync_task = asyncio.create_task(self.sync())
+        await waiter
+        return write_errors
+
+    async def sync(self):
+        await asyncio.sleep(self.fsync_interval)
+        self.sync_task = None
+        waiters, self.sync_waiters = self.sync_waiters, []
+        try:
+            await asyncio.to_thread(os.fsync, self.file.fileno())
+        except OSError as e:
+            logger.error(f"fsync of write journal {self.path} failed: {e}")
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(HTTPException(status_code=503, detail="Write journal is not available"))
+            return
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def read_batch(self, batch_size: int):
+        # Returns the readable status checks, the bytes consumed and the number
+        # of records consumed. Records that cannot be replayed are logged and
+        # dropped rather than stopping the replay, and with it every write, for good.
+        data = os.pread(self.file.fileno(), min(JOURNAL_READ_BYTES, self.size - self.offset), self.offset)
+        lines = data.split(b"\n")[:-1][:batch_size]
+        if not lines:
+            # append() refuses records this large, so this one predates the check
+            length = self.record_length()
+            logger.error(f"Dropping journaled record of {length} bytes at offset {self.offset} of {self.path}")
+            return [], length, 1
+        status_docs = []
+        position = self.offset
+        for line in lines:
+            try:
+                status_doc = json.loads(line)
+                status_doc["timestamp"] = datetime.fromisoformat(status_doc["timestamp"])
+                if not all(isinstance(status_doc.get(field), str) for field in ("id", "client_name")):
+                    raise ValueError("missing id or client_name")
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                logger.error(f"Dropping unreadable journaled record at offset {position} of {self.path}: {e}")
+            else:
+                status_docs.append(status_doc)
+            position += len(line) + 1
+        return status_docs, position - self.offset, len(lines)
+
+    def record_length(self) -> int:
+        # Length of the record at self.offset, newline included
+        position = self.offset
+        while True:
+            data = os.pread(self.file.fileno(), JOURNAL_READ_BYTES, position)
+            end = data.find(b"\n")
+            if end >= 0:
+                return position + end + 1 - self.offset
+            position += len(data)
+
+    async def replay(self, batch_size: int):
+        # Raises on database errors; what was replayed so far stays replayed
+        while self.offset < self.size:
+            status_docs, length, records = self.read_batch(batch_size)
+            write_errors = await status_store.insert(status_docs) if status_docs else {}
+            dropped = set()
+            for index, write_error in write_errors.items():
+                if write_error.get("code") != DUPLICATE_KEY:
+                    logger.error(f"Dropping journaled status check that cannot be written: {write_error.get('errmsg')}")
+                    dropped.add(index)
+            # Duplicates are included: they landed without their rollups and feed event
+            await status_docs_written([doc for index, doc in enumerate(status_docs) if index not in dropped])
+            self.offset += length
+            self.depth -= records
+            self.save_offset()
+            metrics.observe_journal_replay(len(status_docs), self.depth, self.size - self.offset)
+        if self.size:
+            # Fully replayed; nothing was appended since the loop condition was checked
+            self.file.truncate(0)
+            self.size = self.offset = 0
+            self.offset_path.unlink(missing_ok=True)
+
+    def close(self, unlink: bool = False):
+        if unlink:
+            self.path.unlink(missing_ok=True)
+            self.offset_path.unlink(missing_ok=True)
+        self.file.close()
+        self.file = None
+
+def open_status_journal() -> StatusJournal:
+    STATUS_JOURNAL_DIR.mkdir(parents=True, exist_ok=True)
+    max_bytes = int(STATUS_JOURNAL_MAX_MB * 2**20)
+    slot = 0
+    while True:
+        journal = StatusJournal(STATUS_JOURNAL_DIR / f"status_checks-{slot}.journal", max_bytes, STATUS_JOURNAL_FSYNC_MS)
+        if journal.try_open():
+            logger.info(f"Write journal {journal.path} has {journal.depth} status checks to replay")
+            metrics.observe_journal_replay(0, journal.depth, journal.size)
+            return journal
+        slot += 1
+
+async def replay_orphaned_journals():
+    for path in sorted(STATUS_JOURNAL_DIR.glob("status_checks-*.journal")):
+        if path == status_journal.path:
+            continue
+        journal = StatusJournal(path, 0, 0)
+        if not await asyncio.to_thread(journal.try_open):
+            continue
+        try:
+            if journal.depth:
+                logger.info(f"Replaying {journal.depth} status checks from orphaned journal {path}")
+            await journal.replay(STATUS_JOURNAL_REPLAY_BATCH_SIZE)
+            journal.close(unlink=True)
+        finally:
+            if journal.file is not None:
+                journal.close()
+
+async def replay_status_journal():
+    while True:
+        await asyncio.sleep(STATUS_JOURNAL_REPLAY_INTERVAL_MS / 1000)
+        try:
+            # db_available() raises while the circuit is open; the next tick retries.
+            # Replay waits for the unique id index, which spots inserts that landed.
+            if db_available() and indexes_ready:
+                await status_journal.replay(STATUS_JOURNAL_REPLAY_BATCH_SIZE)
+                await replay_orphaned_journals()
+        except HTTPException:
+            pass
+        except Exception as e:
+            logger.warning(f"Write journal replay paused: {e}")
+
+status_journal = None
+status_journal_task = None
+
+async def status_docs_written(status_docs: List[dict]):
+    # Everything that follows a stored write
+    status_cache.invalidate()
+    await record_rollups(status_docs)
+    status_broker.publish(status_docs)
+
+def writes_accepted() -> bool:
+    # With the journal, writes are taken even while the database is down
+    return status_journal is not None or status_store.available()
+
+async def write_status_docs(status_docs: List[dict]) -> Dict[int, dict]:
+    # Stores status checks through the status store, or the journal when the
+    # database cannot take them; returns per-document write errors by index
+    if status_journal is None:
+        write_errors = await status_store.insert(status_docs)
+    else:
+        reason = "backlog" if status_journal.depth else None
+        if reason is None:
+            try:
+                if status_store.available():
+                    write_errors = await asyncio.wait_for(
+                        status_store.insert(status_docs), STATUS_JOURNAL_DEADLINE_MS / 1000
+                    )
+                else:
+                    reason = "unavailable"
+            except asyncio.TimeoutError:
+                reason = "timeout"
+            except HTTPException:
+                reason = "unavailable"
+            except Exception as e:
+                if not is_connection_error(e):
+                    raise
+                reason = "unavailable"
+        if reason is not None:
+            # Rollups and the live feed follow when the journal is replayed
+            return await status_journal.append(status_docs, reason)
+    await status_docs_written([doc for index, doc in enumerate(status_docs) if index not in write_errors])
+    return write_errors
+
+# Write-behind group commit for single status checks
+STATUS_WRITE_BEHIND = env_flag('STATUS_WRITE_BEHIND')
+STATUS_WRITE_BATCH_SIZE = int(os.environ.get('STATUS_WRITE_BATCH_SIZE', '500'))
+STATUS_WRITE_FLUSH_MS = int(os.environ.get('STATUS_WRITE_FLUSH_MS', '20'))
+STATUS_WRITE_QUEUE_SIZE = int(os.environ.get('STATUS_WRITE_QUEUE_SIZE', '10000'))
+# 'flush' acknowledges once the document is written, 'enqueue' as soon as it is buffered
+STATUS_WRITE_ACK = os.environ.get('STATUS_WRITE_ACK', 'flush')
+STATUS_WRITE_ENQUEUE_TIMEOUT_MS = int(os.environ.get('STATUS_WRITE_ENQUEUE_TIMEOUT_MS', '1000'))
+
+class StatusWriteBuffer:
+    def __init__(self, batch_size: int, flush_ms: int, queue_size: int, ack: str, enqueue_timeout_ms: int):
+        self.batch_size = batch_size
+        self.flush_interval = flush_ms / 1000
+        self.queue_size = queue_size
+        self.ack_on_flush = ack != 'enqueue'
+        self.enqueue_timeout = enqueue_timeout_ms / 1000
+        self.queue = None
+        self.wakeup = None
+        self.task = None
+        self.closed = False
+
+    def start(self):
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.wakeup = asyncio.Event()
+        self.task = asyncio.create_task(self.run())
 
-class StatusCheckCreate(BaseModel):
-    client_name: str
+    async def put(self, document: dict) -> Optional[asyncio.Future]:
+        # Returns once the document is queued; with STATUS_WRITE_ACK=flush the
+        # caller then awaits the returned future for the write itself
+        if self.closed:
+            raise HTTPException(status_code=503, detail="Server is shutting down")
+        if status_journal is None:
+            mongo_breaker.check()
+        future = asyncio.get_running_loop().create_future() if self.ack_on_flush else None
+        try:
+            # Backpressure: wait for room in the queue, then shed the request
+            await asyncio.wait_for(self.queue.put((document, future)), self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=503, detail="Write buffer is full", headers={"Retry-After": "1"})
+        self.wakeup.set()
+        return future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self.queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            stopping = False
+            # Flush when the batch is full or the interval has passed, whichever is first
+            while len(batch) < self.batch_size:
+                try:
+                    item = self.queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    self.wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self.wakeup.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                    continue
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self.flush(batch)
+            if stopping:
+                return
+
+    async def flush(self, batch: list):
+        errors = {}
+        try:
+            write_errors = await write_status_docs([document for document, _ in batch])
+            for index, write_error in write_errors.items():
+                errors[index] = HTTPException(status_code=409, detail=write_error.get("errmsg", "Write failed"))
+        except Exception as e:
+            logger.error(f"Database error while flushing {len(batch)} status checks: {e}")
+            errors = {index: self.flush_error(e) for index in range(len(batch))}
+        for index, (_, future) in enumerate(batch):
+            if future is None or future.done():
+                continue
+            if index in errors:
+                future.set_exception(errors[index])
+            else:
+                future.set_result(None)
+
+    @staticmethod
+    def flush_error(error: Exception) -> HTTPException:
+        # One exception per waiting request: a shared instance would collect
+        # every request's traceback as each of them re-raises it
+        if isinstance(error, HTTPException):
+            return HTTPException(status_code=error.status_code, detail=error.detail, headers=error.headers)
+        if is_connection_error(error):
+            return HTTPException(status_code=503, detail="Database is unavailable", headers={"Retry-After": "5"})
+        return HTTPException(status_code=500, detail="Write failed")
+
+    async def drain(self):
+        # Stop accepting writes and flush everything already queued
+        self.closed = True
+        if self.task is None or self.task.done():
+            return
+        await self.queue.put(None)
+        await self.task
+
+status_write_buffer = None
+
+# Live feed of new status checks over Server-Sent Events. Change streams need a
+# replica set; otherwise an in-process pub/sub fed by this process's writes is
+# used, which only sees status checks written through this worker.
+STATUS_FEED_SOURCE = os.environ.get('STATUS_FEED_SOURCE', 'auto')
+STATUS_FEED_HEARTBEAT_MS = int(os.environ.get('STATUS_FEED_HEARTBEAT_MS', '15000'))
+STATUS_FEED_QUEUE_SIZE = int(os.environ.get('STATUS_FEED_QUEUE_SIZE', '1000'))
+STATUS_FEED_MAX_SUBSCRIBERS = int(os.environ.get('STATUS_FEED_MAX_SUBSCRIBERS', '1000'))
+STATUS_FEED_REPLAY_MAX = int(os.environ.get('STATUS_FEED_REPLAY_MAX', '10000'))
+
+class Subscription:
+    def __init__(self, client_name: Optional[str], queue_size: int):
+        self.client_name = client_name
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.lagged = False
+
+class StatusBroker:
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.subscriptions = set()
+
+    def subscribe(self, client_name: Optional[str]) -> Subscription:
+        subscription = Subscription(client_name, self.queue_size)
+        self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self.subscriptions.discard(subscription)
+
+    def publish(self, status_docs: List[dict]):
+        if not self.subscriptions:
+            return
+        for status_doc in status_docs:
+            # Mongo keeps milliseconds, so events match what a list read returns
+            event = {field: status_doc[field] for field in STATUS_FIELDS}
+            event["timestamp"] = event["timestamp"].replace(microsecond=event["timestamp"].microsecond // 1000 * 1000)
+            for subscription in list(self.subscriptions):
+                if subscription.client_name and subscription.client_name != event["client_name"]:
+                    continue
+                try:
+                    subscription.queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    # A slow consumer is cut loose instead of buffering without bound;
+                    # it resumes from the database with its Last-Event-ID
+                    subscription.lagged = True
+                    self.unsubscribe(subscription)
+
+status_broker = StatusBroker(STATUS_FEED_QUEUE_SIZE)
+status_feed_source = None
+# Open feeds of either source, checked against STATUS_FEED_MAX_SUBSCRIBERS
+status_feed_count = 0
+
+async def resolve_feed_source() -> str:
+    global status_feed_source
+    if STATUS_FEED_SOURCE != 'auto':
+        return STATUS_FEED_SOURCE
+    try:
+        available = db_available()
+    except HTTPException:
+        # The circuit is open; fall back without settling on pubsub for good
+        available = False
+    if not available:
+        return 'pubsub'
+    if status_feed_source is None:
+        try:
+            with mongo_op("watch"):
+                async with db.status_checks.watch(max_await_time_ms=1):
+                    pass
+            status_feed_source = 'change_stream'
+        except OperationFailure:
+            # Standalone servers do not support change streams
+            status_feed_source = 'pubsub'
+        except Exception as e:
+            if not is_connection_error(e):
+                raise
+            # Not remembered, so the probe runs again once the database is back
+            return 'pubsub'
+    return status_feed_source
+
+async def counted_feed(events):
+    global status_feed_count
+    status_feed_count += 1
+    try:
+        async for event in events:
+            yield event
+    finally:
+        status_feed_count -= 1
+        await events.aclose()
+
+def sse_event(event_id: str, status_doc: dict) -> bytes:
+    return b"id: " + event_id.encode() + b"\nevent: status_check\ndata: " + dumps(status_doc) + b"\n\n"
+
+def feed_cursor(last_event_id: Optional[str]):
+    # Both sources use keyset cursors as event ids; anything else is a change
+    # stream resume token from an older build, or garbage
+    if not last_event_id:
+        return None
+    try:
+        return decode_cursor(last_event_id)
+    except HTTPException:
+        return None
+
+async def feed_catch_up(client_name: Optional[str], after):
+    try:
+        available = status_store.available()
+    except HTTPException:
+        available = False
+    if not available:
+        return []
+    query = StatusQuery(client_name or None, after=after)
+    return await status_store.find(query, STATUS_FEED_REPLAY_MAX, "find_replay")
+
+async def open_change_stream(client_name: Optional[str], resume_token: Optional[str]):
+    match = {"operationType": "insert"}
+    if client_name:
+        match["fullDocument.client_name"] = client_name
+    if resume_token:
+        try:
+            return await db.status_checks.watch(
+                [{"$match": match}],
+                resume_after={"_data": resume_token},
+                max_await_time_ms=STATUS_FEED_HEARTBEAT_MS,
+            ).__aenter__()
+        except OperationFailure as e:
+            logger.warning(f"Cannot resume the status feed from Last-Event-ID, starting from now: {e}")
+    return await db.status_checks.watch(
+        [{"$match": match}],
+        max_await_time_ms=STATUS_FEED_HEARTBEAT_MS,
+    ).__aenter__()
+
+async def change_stream_feed(client_name: Optional[str], last_event_id: Optional[str]):
+    after = feed_cursor(last_event_id)
+    # Opened before catching up, so nothing inserted in between is missed
+    change_stream = await open_change_stream(client_name, last_event_id if after is None else None)
+    try:
+        last_key = None
+        if after:
+            for status_doc in await feed_catch_up(client_name, after):
+                last_key = (status_doc["timestamp"], status_doc["id"])
+                yield sse_event(encode_cursor(status_doc), status_doc)
+        while True:
+            change = await change_stream.try_next()
+            if change is None:
+                yield b": heartbeat\n\n"
+                continue
+            status_doc = {field: change["fullDocument"][field] for field in STATUS_FIELDS}
+            if last_key is not None and (status_doc["timestamp"], status_doc["id"]) <= last_key:
+                continue
+            yield sse_event(encode_cursor(status_doc), status_doc)
+    finally:
+        await change_stream.close()
+
+async def pubsub_feed(client_name: Optional[str], last_event_id: Optional[str]):
+    # A reconnecting client first catches up from the collection and then
+    # continues with live events
+    subscription = status_broker.subscribe(client_name)
+    try:
+        last_key = None
+        after = feed_cursor(last_event_id)
+        if after:
+            for status_doc in await feed_catch_up(client_name, after):
+                last_key = (status_doc["timestamp"], status_doc["id"])
+                yield sse_event(encode_cursor(status_doc), status_doc)
+        while not subscription.lagged or not subscription.queue.empty():
+            try:
+                status_doc = await asyncio.wait_for(subscription.queue.get(), STATUS_FEED_HEARTBEAT_MS / 1000)
+            except asyncio.TimeoutError:
+                yield b": heartbeat\n\n"
+                continue
+            if last_key is not None and (status_doc["timestamp"], status_doc["id"]) <= last_key:
+                continue
+            yield sse_event(encode_cursor(status_doc), status_doc)
+        yield b"event: lagged\ndata: {}\n\n"
+    finally:
+        status_broker.unsubscribe(subscription)
+
+# Admission control for writes: a token bucket per client_name and/or source
+# address, then a global cap on concurrent writes with a short bounded wait.
+# Rejections are answered before any database work is done.
+ADMISSION_RATE = float(os.environ.get('ADMISSION_RATE', '50'))
+ADMISSION_BURST = float(os.environ.get('ADMISSION_BURST', '100'))
+ADMISSION_KEYS = [key.strip() for key in os.environ.get('ADMISSION_KEYS', 'client_name').split(',') if key.strip()]
+ADMISSION_MAX_KEYS = int(os.environ.get('ADMISSION_MAX_KEYS', '10000'))
+# Proxies in front of the app that append to X-Forwarded-For; 0 ignores the
+# header. ADMISSION_TRUST_PROXY=true is the older spelling of one proxy.
+ADMISSION_TRUSTED_HOPS = int(os.environ.get('ADMISSION_TRUSTED_HOPS', '1' if env_flag('ADMISSION_TRUST_PROXY') else '0'))
+ADMISSION_MAX_CONCURRENCY = int(os.environ.get('ADMISSION_MAX_CONCURRENCY', '64'))
+ADMISSION_QUEUE_SIZE = int(os.environ.get('ADMISSION_QUEUE_SIZE', '128'))
+ADMISSION_QUEUE_TIMEOUT_MS = int(os.environ.get('ADMISSION_QUEUE_TIMEOUT_MS', '250'))
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+
+class RateLimiter:
+    def __init__(self, rate: float, burst: float, max_keys: int):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()
+
+    def bucket(self, key: str, now: float) -> TokenBucket:
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = TokenBucket(self.burst, now)
+            if len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(key)
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+            bucket.updated = now
+        return bucket
+
+    def take(self, costs: Dict[str, float]) -> float:
+        # Returns 0 when every bucket admits the request, otherwise the seconds
+        # until they would. A request larger than the burst is admitted from a
+        # full bucket and leaves it in debt, so big batches are slowed, not refused.
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        buckets = [(self.bucket(key, now), cost) for key, cost in costs.items()]
+        wait = 0.0
+        for bucket, cost in buckets:
+            needed = min(cost, self.burst)
+            if bucket.tokens < needed:
+                wait = max(wait, (needed - bucket.tokens) / self.rate)
+        if wait:
+            return wait
+        for bucket, cost in buckets:
+            bucket.tokens -= cost
+        return 0.0
+
+class ConcurrencyLimiter:
+    def __init__(self, limit: int, queue_size: int, timeout_ms: int):
+        self.limit = limit
+        self.semaphore = None
+        self.queue_size = queue_size
+        self.timeout = timeout_ms / 1000
+        self.waiting = 0
+
+    @asynccontextmanager
+    async def slot(self, route: str):
+        if self.semaphore is None:
+            # Created on first use so it belongs to the worker's event loop
+            self.semaphore = asyncio.Semaphore(self.limit)
+        if self.semaphore.locked():
+            if self.waiting >= self.queue_size:
+                self.reject(route, "queue_full")
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self.semaphore.acquire(), self.timeout)
+            except asyncio.TimeoutError:
+                self.reject(route, "queue_timeout")
+            finally:
+                self.waiting -= 1
+        else:
+            await self.semaphore.acquire()
+        try:
+            yield
+        finally:
+            self.semaphore.release()
+
+    def reject(self, route: str, reason: str):
+        metrics.observe_rejection(route, reason)
+        raise HTTPException(status_code=503, detail="Server is overloaded", headers={"Retry-After": "1"})
+
+write_rate_limiter = RateLimiter(ADMISSION_RATE, ADMISSION_BURST, ADMISSION_MAX_KEYS)
+write_limiter = ConcurrencyLimiter(ADMISSION_MAX_CONCURRENCY, ADMISSION_QUEUE_SIZE, ADMISSION_QUEUE_TIMEOUT_MS)
+
+def client_address(request: Request) -> str:
+    # Every proxy appends the address it received the request from, so the
+    # client is the ADMISSION_TRUSTED_HOPS-th hop from the right. Hops left of
+    # it were sent by the client itself and say nothing about who it is.
+    if ADMISSION_TRUSTED_HOPS:
+        hops = [hop.strip() for hop in ",".join(request.headers.getlist("x-forwarded-for")).split(",") if hop.strip()]
+        if len(hops) >= ADMISSION_TRUSTED_HOPS:
+            return hops[-ADMISSION_TRUSTED_HOPS]
+    return request.client.host if request.client else "unknown"
+
+def admit_write(request: Request, route: str, client_names: List[str]):
+    costs = {}
+    if "ip" in ADMISSION_KEYS:
+        costs["ip:" + client_address(request)] = len(client_names)
+    if "client_name" in ADMISSION_KEYS:
+        for client_name in client_names:
+            costs["client:" + client_name] = costs.get("client:" + client_name, 0) + 1
+    wait = write_rate_limiter.take(costs)
+    if wait:
+        metrics.observe_rejection(route, "rate_limited")
+        raise HTTPException(status_code=429, detail="Rate limit exceeded", headers={"Retry-After": str(math.ceil(wait))})
 
 # Add your routes to the router instead of directly to app
 @api_router.get("/")
@@ -51,26 +1534,230 @@ async def root():
     return {"message": "Hello World"}
 
 @api_router.post("/status", response_model=StatusCheck)
-async def create_status_check(input: StatusCheckCreate):
-    status_dict = input.dict()
-    status_obj = StatusCheck(**status_dict)
-    if mongo_available and db:
-        _ = await db.status_checks.insert_one(status_obj.dict())
-    return status_obj
+async def create_status_check(request: Request, input: StatusCheckCreate):
+    admit_write(request, "/api/status", [input.client_name])
+    status_doc = new_status_doc(input.client_name)
+    # Encode before the insert, which adds an _id to the document
+    body = dumps(status_doc)
+    flushed = None
+    async with write_limiter.slot("/api/status"):
+        if status_write_buffer is not None:
+            flushed = await status_write_buffer.put(status_doc)
+        elif writes_accepted():
+            write_errors = await write_status_docs([status_doc])
+            if write_errors:
+                raise HTTPException(status_code=409, detail=write_errors[0].get("errmsg", "Write failed"))
+    if flushed is not None:
+        # Awaited outside the slot: a buffered write holds no connection, and
+        # holding the slot would cap every flush at ADMISSION_MAX_CONCURRENCY
+        await flushed
+    return Response(body, media_type="application/json")
+
+@api_router.get("/status/stream")
+async def status_feed(request: Request, client_name: Optional[str] = None):
+    if status_feed_count >= STATUS_FEED_MAX_SUBSCRIBERS:
+        raise HTTPException(status_code=503, detail="Too many feed subscribers", headers={"Retry-After": "5"})
+    last_event_id = request.headers.get("last-event-id")
+    if await resolve_feed_source() == 'change_stream':
+        events = change_stream_feed(client_name, last_event_id)
+    else:
+        events = pubsub_feed(client_name, last_event_id)
+    return StreamingResponse(
+        counted_feed(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@api_router.get("/ready")
+async def readiness():
+    # Readiness for load balancers, unlike the liveness route /api/: ready once
+    # the store is usable and, with MongoDB, the pool is warm, the indexes are
+    # in place and the circuit is closed
+    if status_store.name == "embedded":
+        ready = status_store.available()
+        body = {"ready": ready, "database": "embedded"}
+    elif not mongo_available or db is None:
+        ready = True
+        body = {"ready": ready, "database": "disabled"}
+    else:
+        ready = mongo_health["warmed_up"] and indexes_ready and mongo_breaker.state == "closed"
+        body = jsonable_encoder({
+            "ready": ready,
+            "database": "mongo",
+            "circuit": mongo_breaker.state,
+            "indexes_ready": indexes_ready,
+            **mongo_health,
+            "pool": {
+                **mongo_pool_stats.snapshot(),
+                "max_size": MONGO_MAX_POOL_SIZE,
+                "min_size": MONGO_MIN_POOL_SIZE,
+                "max_idle_time_ms": MONGO_MAX_IDLE_TIME_MS or None,
+                "wait_queue_timeout_ms": MONGO_WAIT_QUEUE_TIMEOUT_MS or None,
+            },
+        })
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+@api_router.get("/health/db")
+async def database_health():
+    if status_store.name == "embedded":
+        return {"database": "embedded", "path": str(status_store.path), "documents": len(status_store.documents)}
+    if not mongo_available or db is None:
+        return {"database": "disabled"}
+    body = jsonable_encoder({
+        "database": "up" if mongo_breaker.state == "closed" else "down",
+        "circuit": mongo_breaker.state,
+        "consecutive_failures": mongo_breaker.failures,
+        "last_error": mongo_breaker.last_error,
+        **mongo_health,
+    })
+    return JSONResponse(body, status_code=200 if mongo_breaker.state == "closed" else 503)
 
 @api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    try:
-        if mongo_available and db:
-            status_checks = await db.status_checks.find().to_list(1000)
-            return [StatusCheck(**status_check) for status_check in status_checks]
-        else:
-            # Return empty list if MongoDB is not available
+async def get_status_checks(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=STATUS_PAGE_MAX),
+    after: Optional[str] = None,
+    client_name: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    stream: bool = False,
+    explain: bool = False,
+):
+    query = status_query(client_name, since, until, after)
+    if explain:
+        return JSONResponse(await explain_status_query(query, limit or STATUS_PAGE_SIZE))
+    if wants_ndjson(request, stream):
+        # Unbounded unless a limit is given; documents are written as they arrive
+        status_checks = stream_status_checks(query, limit) if status_store.available() else iter(())
+        return StreamingResponse(status_checks, media_type=NDJSON_MEDIA_TYPE)
+    limit = limit or STATUS_PAGE_SIZE
+    key = (limit, after, client_name, since, until)
+    page = status_cache.get(key)
+    if page is None:
+        generation = status_cache.generation
+        try:
+            # Keyed by generation so reads never join a query that started before a write
+            page = await status_reads.do(
+                (key, generation), lambda: load_cached_page(key, query, limit, generation)
+            )
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Database error in get_status_checks: {e}")
+            # Return empty list on any error
             return []
-    except Exception as e:
-        print(f"Database error in get_status_checks: {e}")
-        # Return empty list on any error
-        return []
+    return page_response(page, request)
+
+@api_router.get("/status/export")
+async def export_status(
+    format: ExportFormat = "csv",
+    limit: Optional[int] = Query(None, ge=1),
+    after: Optional[str] = None,
+    client_name: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    query = status_query(client_name, since, until, after)
+    encoder = export_encoder(format)
+    if status_store.available():
+        chunks = export_status_checks(query, limit, encoder)
+    else:
+        chunks = iter([encoder.close()])
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="status_checks.{format}"'},
+    )
+
+async def write_status_batch(status_docs: list) -> Dict[int, str]:
+    failed = {}
+    if status_docs and writes_accepted():
+        try:
+            write_errors = await write_status_docs([doc for _, doc in status_docs])
+            for position, write_error in write_errors.items():
+                failed[status_docs[position][0]] = write_error.get("errmsg", "Write failed")
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Database error in create_status_checks_batch: {e}")
+            failed = {index: "Database error" for index, _ in status_docs}
+    return failed
+
+def batch_result(results: List[StatusCheckBatchItem], status_docs: list, failed: Dict[int, str]) -> StatusCheckBatchResult:
+    for index, error in failed.items():
+        results[index] = StatusCheckBatchItem(index=index, error=error)
+    return StatusCheckBatchResult(inserted=len(status_docs) - len(failed), results=results)
+
+@api_router.post("/status/batch", response_model=StatusCheckBatchResult)
+async def create_status_checks_batch(request: Request):
+    items = parse_batch_body(await read_batch_body(request), request.headers.get("content-type", ""))
+    results, status_docs = build_batch(items)
+    admit_write(request, "/api/status/batch", [doc["client_name"] for _, doc in status_docs])
+    # The slot covers the insert only; the batch is not sent through the
+    # write-behind buffer, so there is no flush to wait for afterwards
+    async with write_limiter.slot("/api/status/batch"):
+        failed = await write_status_batch(status_docs)
+    return batch_result(results, status_docs, failed)
+
+@api_router.get("/status/stats", response_model=StatusStats)
+async def get_status_stats(
+    granularity: RollupGranularity = "hour",
+    client_name: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    # Served from rollup documents, so the cost is O(buckets) rather than O(status checks)
+    buckets = []
+    if db_available():
+        cursor = db.status_rollups.find(stats_filter(granularity, client_name, since, until), STATS_PROJECTION)
+        with mongo_op("find_rollups") as op:
+            buckets = await cursor.sort(STATS_SORT).to_list(STATS_MAX_BUCKETS + 1)
+            op.documents = len(buckets)
+    return status_stats(granularity, buckets)
+
+if STATS_REBUILD_TOKEN:
+    @api_router.post("/status/stats/rebuild")
+    async def rebuild_status_stats(request: Request, granularity: Optional[RollupGranularity] = None):
+        check_rebuild_token(request)
+        if not db_available():
+            raise HTTPException(status_code=503, detail="Database is not available")
+        granularities = [granularity] if granularity else list(ROLLUP_GRANULARITIES)
+        with mongo_op("aggregate"):
+            for name in granularities:
+                await rebuild_rollups(name)
+        return {"rebuilt": granularities}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+def check_profile_token(request: Request):
+    if PROFILE_TOKEN and not secrets.compare_digest(request.headers.get("x-profile-token", ""), PROFILE_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid profile token")
+
+def read_profile_summary(path: Path) -> dict:
+    return json.loads(path.read_bytes())
+
+if PROFILING:
+    @api_router.get("/admin/profiles")
+    async def list_profiles(request: Request, limit: int = Query(20, ge=1, le=1000)):
+        check_profile_token(request)
+        paths = sorted(PROFILE_DIR.glob("*.json"), reverse=True)[:limit] if PROFILE_DIR.exists() else []
+        summaries = [await asyncio.to_thread(read_profile_summary, path) for path in paths]
+        for summary in summaries:
+            summary.pop("functions", None)
+        return summaries
+
+    @api_router.get("/admin/profiles/{profile_id}")
+    async def get_profile(request: Request, profile_id: str, format: Literal["json", "prof"] = "json"):
+        # ?format=prof downloads the pstats file for snakeviz or python -m pstats
+        check_profile_token(request)
+        path = PROFILE_DIR / f"{profile_id}.{format}"
+        if not PROFILE_ID_PATTERN.match(profile_id) or not path.exists():
+            raise HTTPException(status_code=404, detail="Profile not found")
+        if format == "prof":
+            return FileResponse(path, media_type="application/octet-stream", filename=path.name)
+        return await asyncio.to_thread(read_profile_summary, path)
 
 # Include the router in the main app
 app.include_router(api_router)
@@ -81,16 +1768,175 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Profile-Id"],
 )
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
+if COMPRESSION:
+    app.add_middleware(CompressionMiddleware, metrics=metrics)
+
+if PROFILING:
+    app.add_middleware(ProfilingMiddleware)
+
+app.add_middleware(AccessLogMiddleware)
+
+# Added last so it wraps every other middleware and sees the final status
+app.add_middleware(MetricsMiddleware, metrics=metrics)
+
+# Retention for status_checks. "ttl" lets MongoDB expire documents with a TTL
+# index, "archive" moves expired documents in batches to an archive collection
+# or gzip NDJSON files before deleting them, and "capped" turns status_checks
+# into a fixed-size capped collection that overwrites its oldest documents.
+# STATUS_RETENTION and STATUS_RETENTION_DAYS are read in core.py.
+STATUS_CAPPED_SIZE_MB = int(os.environ.get('STATUS_CAPPED_SIZE_MB', '256'))
+STATUS_ARCHIVE_TARGET = os.environ.get('STATUS_ARCHIVE_TARGET', 'collection')
+STATUS_ARCHIVE_COLLECTION = os.environ.get('STATUS_ARCHIVE_COLLECTION', 'status_checks_archive')
+STATUS_ARCHIVE_DIR = Path(os.environ.get('STATUS_ARCHIVE_DIR', str(ROOT_DIR / 'archive')))
+STATUS_ARCHIVE_BATCH_SIZE = int(os.environ.get('STATUS_ARCHIVE_BATCH_SIZE', '1000'))
+STATUS_ARCHIVE_INTERVAL_MS = int(os.environ.get('STATUS_ARCHIVE_INTERVAL_MS', '60000'))
+
+async def ensure_retention():
+    if STATUS_RETENTION == 'ttl':
+        await ensure_ttl_index(db)
+    elif STATUS_RETENTION == 'none':
+        await drop_ttl_index(db)
+    elif STATUS_RETENTION == 'archive':
+        # A leftover TTL index would delete documents before they are archived
+        await drop_ttl_index(db)
+        if STATUS_ARCHIVE_TARGET == 'collection':
+            await db[STATUS_ARCHIVE_COLLECTION].create_index([("id", 1)], name="id_unique", unique=True)
+    elif STATUS_RETENTION == 'capped':
+        size = STATUS_CAPPED_SIZE_MB * 1024 * 1024
+        if "status_checks" not in await db.list_collection_names():
+            await db.create_collection("status_checks", capped=True, size=size)
+        elif not (await db.status_checks.options()).get("capped"):
+            # Rewrites the collection under an exclusive lock and drops its
+            # secondary indexes, which ensure_status_indexes then recreates
+            logger.warning(f"Converting status_checks to a capped collection of {STATUS_CAPPED_SIZE_MB} MB")
+            await db.command("convertToCapped", "status_checks", size=size)
+
+def write_archive_file(status_docs: List[dict]) -> Path:
+    # Named after the first document so a batch re-archived after a crash
+    # replaces its earlier file instead of duplicating it
+    first = status_docs[0]
+    path = STATUS_ARCHIVE_DIR / f"status_checks-{first['timestamp']:%Y%m%dT%H%M%S%f}-{first['id']}.ndjson.gz"
+    STATUS_ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + ".partial")
+    with gzip.open(partial, "wb") as archive:
+        for status_doc in status_docs:
+            archive.write(dumps({field: status_doc[field] for field in STATUS_FIELDS}) + b"\n")
+    os.replace(partial, path)
+    return path
+
+async def archive_batch(status_docs: List[dict]):
+    if STATUS_ARCHIVE_TARGET == 'file':
+        await asyncio.to_thread(write_archive_file, status_docs)
+        return
+    try:
+        with mongo_op("archive_insert") as op:
+            op.documents = len(status_docs)
+            await db[STATUS_ARCHIVE_COLLECTION].insert_many(status_docs, ordered=False)
+    except BulkWriteError as e:
+        # Documents already archived by a run that stopped before deleting them
+        if any(error["code"] != DUPLICATE_KEY for error in e.details.get("writeErrors", [])):
+            raise
+
+async def archive_expired() -> int:
+    cutoff = datetime.utcnow() - timedelta(days=STATUS_RETENTION_DAYS)
+    archived = 0
+    while True:
+        # Oldest first, so every batch is a range scan on timestamp_id
+        cursor = db.status_checks.find({"timestamp": {"$lt": cutoff}}).sort(STATUS_SORT).limit(STATUS_ARCHIVE_BATCH_SIZE)
+        with mongo_op("archive_find") as op:
+            status_docs = await cursor.to_list(STATUS_ARCHIVE_BATCH_SIZE)
+            op.documents = len(status_docs)
+        if not status_docs:
+            break
+        # Deleted only once the batch is stored, so a failure in between
+        # archives the same batch again rather than losing it
+        await archive_batch(status_docs)
+        with mongo_op("archive_delete") as op:
+            result = await db.status_checks.delete_many({"_id": {"$in": [doc["_id"] for doc in status_docs]}})
+            op.documents = result.deleted_count
+        archived += len(status_docs)
+        if len(status_docs) < STATUS_ARCHIVE_BATCH_SIZE:
+            break
+    return archived
+
+async def archive_status_checks():
+    while True:
+        archived, failed = 0, False
+        try:
+            if db_available():
+                archived = await archive_expired()
+            if archived:
+                logger.info(f"Archived {archived} status checks to {STATUS_ARCHIVE_TARGET}")
+        except asyncio.CancelledError:
+            raise
+        except HTTPException:
+            # Circuit open; try again on the next run
+            failed = True
+        except Exception as e:
+            logger.error(f"Status check archival failed: {e}")
+            failed = True
+        metrics.observe_archive(STATUS_ARCHIVE_TARGET, archived, failed)
+        await asyncio.sleep(STATUS_ARCHIVE_INTERVAL_MS / 1000)
+
+status_archive_task = None
+
+# The event loop only keeps weak references to tasks
+status_index_task = None
+indexes_ready = False
+
+async def ensure_status_indexes():
+    global indexes_ready
+    # Capped conversion drops indexes, so retention is applied first
+    try:
+        await ensure_retention()
+    except Exception as e:
+        logger.warning(f"Retention setup failed for {STATUS_RETENTION}: {e}")
+    indexes_ready = await create_status_indexes(db)
+
+@app.on_event("startup")
+async def startup_db_client():
+    global status_write_buffer, mongo_monitor_task, status_archive_task, status_journal, status_journal_task
+    global status_index_task
+    route_server_logs()
+    await status_store.open()
+    # Run in the background so an unreachable database does not block startup
+    if mongo_available and db is not None:
+        status_index_task = asyncio.create_task(ensure_status_indexes())
+        mongo_monitor_task = asyncio.create_task(monitor_mongo())
+        if STATUS_RETENTION == 'archive':
+            status_archive_task = asyncio.create_task(archive_status_checks())
+        if STATUS_JOURNAL:
+            status_journal = await asyncio.to_thread(open_status_journal)
+            status_journal_task = asyncio.create_task(replay_status_journal())
+    if status_store.configured:
+        if STATUS_WRITE_BEHIND:
+            status_write_buffer = StatusWriteBuffer(
+                STATUS_WRITE_BATCH_SIZE,
+                STATUS_WRITE_FLUSH_MS,
+                STATUS_WRITE_QUEUE_SIZE,
+                STATUS_WRITE_ACK,
+                STATUS_WRITE_ENQUEUE_TIMEOUT_MS,
+            )
+            status_write_buffer.start()
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    if mongo_monitor_task is not None:
+        mongo_monitor_task.cancel()
+    if status_archive_task is not None:
+        status_archive_task.cancel()
+    if status_write_buffer is not None:
+        await status_write_buffer.drain()
+    if status_journal_task is not None:
+        status_journal_task.cancel()
+    if status_journal is not None:
+        # Whatever is still journaled is replayed by the next worker to start
+        if status_journal.sync_task is not None:
+            await status_journal.sync_task
+        status_journal.close()
+    await status_store.close()
     if client:
         client.close()
@@ -2,19 +2,29 @@
 """
 Backend API Testing Suite for Vercel Deployment
 Tests FastAPI backend functionality including health checks, database operations, and CORS configuration.
+
+With --bench it instead runs a load benchmark of the root route, POST /api/status
+and GET /api/status, either against a live server or in-process against the
+ASGI app backed by an in-memory MongoDB stand-in (--in-process, needs httpx and
+mongomock-motor) or by the embedded storage engine (--in-process --storage
+embedded, needs only httpx). Results can be saved with --output and compared with a
+previous run with --baseline; regressions beyond --threshold fail the run.
 """
 
+import argparse
 import asyncio
 import aiohttp
 import json
 import os
 import sys
+import time
 from datetime import datetime
+from pathlib import Path
 from typing import Dict, Any, List
 import uuid
 
 # Test configuration
-BACKEND_URL = "http://localhost:8001"  # Internal backend URL
+BACKEND_URL = os.environ.get("BACKEND_URL", "http://localhost:8001")  # Internal backend URL
 API_BASE = f"{BACKEND_URL}/api"
 
 class BackendTester:
@@ -291,8 +301,215 @@ class BackendTester:
             
         return passed_tests == total_tests
 
+BENCH_SCENARIOS = {
+    "root": ("GET", "/api/"),
+    "create": ("POST", "/api/status"),
+    "list": ("GET", "/api/status"),
+}
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+class LiveTarget:
+    """Sends benchmark requests to a running server"""
+    name = "live"
+
+    def __init__(self, base_url: str, concurrency: int):
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        self.session = aiohttp.ClientSession(connector=connector)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    async def request(self, method: str, path: str, payload: Dict = None) -> int:
+        async with self.session.request(method, f"{self.base_url}{path}", json=payload) as response:
+            await response.read()
+            return response.status
+
+class InProcessTarget:
+    """Calls backend/server.py through ASGI with an in-memory MongoDB stand-in or the embedded engine"""
+
+    def __init__(self, concurrency: int, storage: str = "mongomock"):
+        self.name = f"in-process ({storage})"
+        self.storage = storage
+        self.client = None
+        self.server = None
+        self.store_dir = None
+
+    async def __aenter__(self):
+        import logging
+        import tempfile
+
+        import httpx
+
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+
+        # Measure the request path, not rate limiting or per-request log output
+        os.environ.setdefault("ADMISSION_RATE", "0")
+        os.environ.setdefault("ACCESS_LOG", "false")
+        if self.storage == "embedded":
+            self.store_dir = tempfile.TemporaryDirectory()
+            os.environ["STORAGE_ENGINE"] = "embedded"
+            os.environ["EMBEDDED_STORE_PATH"] = str(Path(self.store_dir.name) / "status_checks.log")
+        sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+        import server
+
+        self.server = server
+        if self.storage == "embedded":
+            await server.status_store.open()
+        else:
+            from mongomock_motor import AsyncMongoMockClient
+
+            server.client = AsyncMongoMockClient()
+            server.db = server.client[server.db_name]
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://bench")
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.client.aclose()
+        if self.store_dir is not None:
+            await self.server.status_store.close()
+            self.store_dir.cleanup()
+
+    async def request(self, method: str, path: str, payload: Dict = None) -> int:
+        response = await self.client.request(method, path, json=payload)
+        return response.status_code
+
+class Benchmark:
+    def __init__(self, target, concurrency: int, duration: float, warmup: float):
+        self.target = target
+        self.concurrency = concurrency
+        self.duration = duration
+        self.warmup = warmup
+
+    async def worker(self, method: str, path: str, deadline: float, latencies: List[float], errors: List[int]):
+        client_name = f"Bench_{uuid.uuid4().hex[:8]}"
+        while time.perf_counter() < deadline:
+            payload = {"client_name": client_name} if method == "POST" else None
+            started = time.perf_counter()
+            try:
+                status = await self.target.request(method, path, payload)
+            except Exception:
+                status = 0
+            latencies.append(time.perf_counter() - started)
+            if status == 0 or status >= 400:
+                errors.append(status)
+
+    async def run_scenario(self, name: str) -> Dict[str, Any]:
+        method, path = BENCH_SCENARIOS[name]
+        if self.warmup:
+            deadline = time.perf_counter() + self.warmup
+            await asyncio.gather(*(self.worker(method, path, deadline, [], []) for _ in range(self.concurrency)))
+        latencies, errors = [], []
+        started = time.perf_counter()
+        deadline = started + self.duration
+        await asyncio.gather(*(self.worker(method, path, deadline, latencies, errors) for _ in range(self.concurrency)))
+        elapsed = time.perf_counter() - started
+        latencies.sort()
+        return {
+            "method": method,
+            "path": path,
+            "requests": len(latencies),
+            "throughput_rps": round(len(latencies) / elapsed, 1),
+            "error_rate": round(len(errors) / len(latencies), 4) if latencies else 1.0,
+            "latency_ms": {
+                "p50": round(percentile(latencies, 0.50) * 1000, 3),
+                "p95": round(percentile(latencies, 0.95) * 1000, 3),
+                "p99": round(percentile(latencies, 0.99) * 1000, 3),
+                "max": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+            },
+        }
+
+    async def run(self, scenarios: List[str]) -> Dict[str, Any]:
+        results = {
+            "target": self.target.name,
+            "concurrency": self.concurrency,
+            "duration": self.duration,
+            "timestamp": datetime.utcnow().isoformat(),
+            "scenarios": {},
+        }
+        async with self.target:
+            for name in scenarios:
+                result = results["scenarios"][name] = await self.run_scenario(name)
+                latency = result["latency_ms"]
+                print(f"  {name:<7} {result['throughput_rps']:>9.1f} req/s  errors {result['error_rate']:>7.2%}  "
+                      f"p50 {latency['p50']:>8.2f}  p95 {latency['p95']:>8.2f}  p99 {latency['p99']:>8.2f}  "
+                      f"max {latency['max']:>8.2f} ms")
+        return results
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """Regressions of more than threshold percent in throughput or p95/p99 latency,
+    or of more than threshold percentage points in error rate"""
+    regressions = []
+    for name, result in current["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        change = (result["throughput_rps"] - previous["throughput_rps"]) / previous["throughput_rps"] * 100
+        print(f"  {name:<7} throughput {change:+7.1f}%", end="")
+        if change < -threshold:
+            regressions.append(f"{name}: throughput {change:+.1f}%")
+        for quantile in ("p95", "p99"):
+            before, after = previous["latency_ms"][quantile], result["latency_ms"][quantile]
+            change = (after - before) / before * 100 if before else 0.0
+            print(f"  {quantile} {change:+7.1f}%", end="")
+            if change > threshold:
+                regressions.append(f"{name}: {quantile} latency {change:+.1f}%")
+        change = (result["error_rate"] - previous["error_rate"]) * 100
+        print(f"  errors {change:+.2f} pts")
+        if change > threshold:
+            regressions.append(f"{name}: error rate {change:+.2f} points")
+    return regressions
+
+async def run_benchmark(args) -> bool:
+    if args.in_process:
+        target = InProcessTarget(args.concurrency, args.storage)
+    else:
+        target = LiveTarget(args.url, args.concurrency)
+    print(f"🚀 Benchmarking {target.name} backend: concurrency {args.concurrency}, {args.duration}s per scenario")
+    results = await Benchmark(target, args.concurrency, args.duration, args.warmup).run(args.scenarios)
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        print(f"💾 Results saved to {args.output}")
+    if not args.baseline:
+        return True
+    print(f"\n📊 Compared with {args.baseline} (threshold {args.threshold}%)")
+    regressions = compare_results(json.loads(Path(args.baseline).read_text()), results, args.threshold)
+    for regression in regressions:
+        print(f"❌ Regression: {regression}")
+    return not regressions
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bench", action="store_true", help="run the load benchmark instead of the tests")
+    parser.add_argument("--url", default=BACKEND_URL, help="server to benchmark (default: %(default)s)")
+    parser.add_argument("--in-process", action="store_true", help="benchmark the ASGI app in-process")
+    parser.add_argument("--storage", choices=["mongomock", "embedded"], default="mongomock",
+                        help="storage behind the in-process app (default: %(default)s)")
+    parser.add_argument("--scenarios", nargs="+", choices=list(BENCH_SCENARIOS), default=list(BENCH_SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent requests in flight")
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=1.0, help="unmeasured seconds before each scenario")
+    parser.add_argument("--output", help="save the results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed regression in percent")
+    return parser.parse_args()
+
 async def main():
     """Main test runner"""
+    args = parse_args()
+    if args.bench:
+        sys.exit(0 if await run_benchmark(args) else 1)
+
     tester = BackendTester()
     success = await tester.run_all_tests()
     
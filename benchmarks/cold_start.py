@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Cold Start Benchmark for the Vercel API Function
+Measures import time, first-request latency and warm-request latency of
+api/index.py in fresh interpreter processes, the way a new serverless
+container would see them.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+API_DIR = Path(__file__).resolve().parent.parent / "api"
+
+# Runs inside a fresh interpreter; prints one JSON line with the timings
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import index
+imported = time.perf_counter()
+event = {
+    "version": "2.0", "routeKey": "$default", "rawPath": PATH, "rawQueryString": "",
+    "headers": {"host": "localhost"}, "isBase64Encoded": False,
+    "requestContext": {"http": {"method": "GET", "path": PATH, "sourceIp": "127.0.0.1",
+                                "protocol": "HTTP/1.1"}, "stage": "$default"},
+}
+context = type("Context", (), {})()
+first = index.handler(event, context)
+first_done = time.perf_counter()
+index.handler(event, context)
+warm_done = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "first_request_ms": (first_done - imported) * 1000,
+    "warm_request_ms": (warm_done - first_done) * 1000,
+    "status_code": first["statusCode"],
+}))
+"""
+
+
+def run_probe(path: str) -> dict:
+    """Run one cold start in a new process"""
+    code = f"PATH = {path!r}\n{PROBE}"
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=API_DIR, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def import_profile(top: int) -> list:
+    """Return the modules with the highest cumulative import time"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import index"],
+        cwd=API_DIR, capture_output=True, text=True, check=True,
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        rows.append((int(cumulative), module.strip()))
+    return [{"module": module, "cumulative_ms": us / 1000} for us, module in sorted(rows, reverse=True)[:top]]
+
+
+def summarize(values: list) -> dict:
+    """Summary statistics for a list of milliseconds"""
+    ordered = sorted(values)
+    return {
+        "median": statistics.median(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "min": ordered[0],
+        "max": ordered[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="number of cold starts to measure")
+    parser.add_argument("--path", default="/", help="route requested by the probe")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list (0 to skip)")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    samples = [run_probe(args.path) for _ in range(args.runs)]
+    results = {
+        "runs": args.runs,
+        "path": args.path,
+        "status_codes": sorted({sample["status_code"] for sample in samples}),
+    }
+    for metric in ("import_ms", "first_request_ms", "warm_request_ms"):
+        results[metric] = summarize([sample[metric] for sample in samples])
+    if args.top:
+        results["slowest_imports"] = import_profile(args.top)
+
+    print("📊 Cold start (ms)")
+    for metric in ("import_ms", "first_request_ms", "warm_request_ms"):
+        stats = results[metric]
+        print(f"  {metric:<18} median {stats['median']:8.1f}  p95 {stats['p95']:8.1f}  max {stats['max']:8.1f}")
+    for row in results.get("slowest_imports", []):
+        print(f"  {row['cumulative_ms']:8.1f}  {row['module']}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Response Compression Benchmark
+Compresses GET /api/status bodies of several sizes, plus a streamed NDJSON
+listing, with the encoders used by the compression middleware in
+backend/core.py, and reports the bytes saved and the CPU time per response
+for each encoding and level. Every result is decompressed and compared with
+the original. brotli and zstd are skipped when their packages are missing.
+"""
+import argparse
+import gzip
+import json
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+# core reads its settings at import time, as it does under backend/server.py
+load_dotenv(BACKEND_DIR / ".env")
+
+import core  # noqa: E402
+
+LEVEL_SETTINGS = {
+    "gzip": "COMPRESSION_GZIP_LEVEL",
+    "br": "COMPRESSION_BROTLI_QUALITY",
+    "zstd": "COMPRESSION_ZSTD_LEVEL",
+}
+
+
+def make_docs(count: int) -> list:
+    """Documents shaped like find(query, STATUS_PROJECTION) results"""
+    start = datetime(2024, 1, 1)
+    return [
+        {"id": str(uuid.uuid4()), "client_name": f"client-{i % 50}", "timestamp": start + timedelta(milliseconds=i * 37)}
+        for i in range(count)
+    ]
+
+
+def make_bodies(sizes: list, stream_size: int, chunk_size: int) -> dict:
+    """Response bodies as the app sends them: one chunk per page, many for a stream"""
+    bodies = {f"list {size}": [core.dumps(make_docs(size))] for size in sizes}
+    if stream_size:
+        docs = make_docs(stream_size)
+        bodies[f"ndjson {stream_size}"] = [
+            b"".join(core.dumps(doc) + b"\n" for doc in docs[offset:offset + chunk_size])
+            for offset in range(0, stream_size, chunk_size)
+        ]
+    return bodies
+
+
+def decompress(encoding: str, data: bytes) -> bytes:
+    if encoding == "gzip":
+        return gzip.decompress(data)
+    if encoding == "br":
+        import brotli
+        return brotli.decompress(data)
+    import zstandard
+    return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+
+
+def compress_response(encoding: str, chunks: list) -> bytes:
+    encoder = core.ENCODERS[encoding]()
+    return b"".join(encoder.compress(chunk, index == len(chunks) - 1) for index, chunk in enumerate(chunks))
+
+
+def measure(encoding: str, level: int, chunks: list, min_time: float) -> dict:
+    setattr(core, LEVEL_SETTINGS[encoding], level)
+    raw = b"".join(chunks)
+    compressed = compress_response(encoding, chunks)
+    if decompress(encoding, compressed) != raw:
+        raise AssertionError(f"{encoding} level {level} did not round-trip")
+    runs = 0
+    started = time.process_time()
+    while True:
+        compress_response(encoding, chunks)
+        runs += 1
+        elapsed = time.process_time() - started
+        if elapsed >= min_time:
+            break
+    cpu_us = elapsed / runs * 1e6
+    return {
+        "encoding": encoding,
+        "level": level,
+        "raw_bytes": len(raw),
+        "compressed_bytes": len(compressed),
+        "saved_percent": round((1 - len(compressed) / len(raw)) * 100, 1),
+        "cpu_us": round(cpu_us, 1),
+        "cpu_us_per_kib": round(cpu_us / (len(raw) / 1024), 2),
+    }
+
+
+def parse_levels(values: list) -> list:
+    levels = []
+    for value in values:
+        encoding, _, level = value.partition(":")
+        if encoding not in LEVEL_SETTINGS:
+            raise SystemExit(f"Unknown encoding {encoding!r}; expected one of {', '.join(LEVEL_SETTINGS)}")
+        if encoding not in core.ENCODERS:
+            print(f"⚠️  Skipping {encoding}: its package is not installed")
+            continue
+        levels.append((encoding, int(level)))
+    return levels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100, 1000], help="status checks per list response")
+    parser.add_argument("--stream-size", type=int, default=10000, help="status checks in the NDJSON stream (0 skips it)")
+    parser.add_argument("--levels", nargs="+", default=["gzip:1", "gzip:6", "br:4", "br:11", "zstd:3", "zstd:10"],
+                        help="encoding:level pairs to compare")
+    parser.add_argument("--min-time", type=float, default=0.5, help="CPU seconds spent per measurement")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    levels = parse_levels(args.levels)
+    bodies = make_bodies(args.sizes, args.stream_size, core.STATUS_STREAM_BATCH_SIZE)
+    results = {"min_size": core.COMPRESSION_MIN_SIZE, "responses": {}}
+    for name, chunks in bodies.items():
+        raw_bytes = sum(len(chunk) for chunk in chunks)
+        note = "  (below COMPRESSION_MIN_SIZE, sent uncompressed)" if len(chunks) == 1 and raw_bytes < core.COMPRESSION_MIN_SIZE else ""
+        print(f"📊 {name}: {raw_bytes} bytes in {len(chunks)} chunk(s){note}")
+        runs = results["responses"][name] = [measure(encoding, level, chunks, args.min_time) for encoding, level in levels]
+        for run in runs:
+            print(f"  {run['encoding']:>4}:{run['level']:<2}  {run['compressed_bytes']:>9} bytes  saved {run['saved_percent']:5.1f}%  "
+                  f"cpu {run['cpu_us']:>10.1f} us  {run['cpu_us_per_kib']:>6.2f} us/KiB")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Load Test for the Production Launcher
+Starts backend/server.py under gunicorn (backend/gunicorn.conf.py) with each
+requested worker count and drives it with keep-alive HTTP/1.1 connections from
+several client processes, reporting throughput and latency per worker count.
+Throughput should grow with workers up to the number of cores, as long as the
+client processes have cores of their own.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    env = dict(os.environ, PORT=str(port), WEB_CONCURRENCY=str(workers))
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "server:app"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+def wait_ready(port: int, path: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1) as sock:
+                sock.sendall(f"GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode())
+                if sock.recv(12).startswith(b"HTTP/1.1 2"):
+                    return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not become ready")
+
+
+async def connection_loop(port: int, path: str, deadline: float, latencies: list):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    request = f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode()
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            writer.write(request)
+            headers = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in headers.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - started)
+    finally:
+        writer.close()
+
+
+def client_process(port: int, path: str, connections: int, duration: float, results):
+    async def run():
+        latencies = []
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(connection_loop(port, path, deadline, latencies) for _ in range(connections)))
+        return latencies
+
+    results.put(asyncio.run(run()))
+
+
+def run_load(port: int, path: str, clients: int, connections: int, duration: float) -> dict:
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=client_process, args=(port, path, connections, duration, results))
+        for _ in range(clients)
+    ]
+    for process in processes:
+        process.start()
+    latencies = []
+    for _ in processes:
+        latencies.extend(results.get())
+    for process in processes:
+        process.join()
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / duration, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="worker counts to compare")
+    parser.add_argument("--path", default="/api/", help="route to request")
+    parser.add_argument("--clients", type=int, default=max(1, (os.cpu_count() or 2) // 2), help="client processes")
+    parser.add_argument("--connections", type=int, default=32, help="keep-alive connections per client process")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load per worker count")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = {"path": args.path, "cpus": os.cpu_count(), "runs": []}
+    for workers in args.workers:
+        port = free_port()
+        server = start_server(workers, port)
+        try:
+            wait_ready(port, args.path)
+            run = run_load(port, args.path, args.clients, args.connections, args.duration)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait()
+        run["workers"] = workers
+        results["runs"].append(run)
+        print(f"  {workers:>3} workers  {run['rps']:>10.1f} req/s  p50 {run['p50_ms']:>7.2f} ms  p99 {run['p99_ms']:>7.2f} ms")
+
+    baseline = results["runs"][0]["rps"]
+    print(f"📊 Throughput vs {args.workers[0]} worker(s) on {results['cpus']} CPUs: "
+          + ", ".join(f"{run['workers']}w x{run['rps'] / baseline:.2f}" for run in results["runs"]))
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Serialization Benchmark for Status Check Responses
+Compares the previous model path (StatusCheck models validated against the
+response_model and rendered by FastAPI) with the raw-document fast path used by
+backend/server.py, and checks that both produce identical bytes.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+
+import server  # noqa: E402
+import core  # noqa: E402
+
+
+def make_docs(count: int) -> list:
+    """Documents shaped like find(query, STATUS_PROJECTION) results"""
+    start = datetime(2024, 1, 1)
+    return [
+        {"id": str(uuid.uuid4()), "client_name": f"client-{i % 50}", "timestamp": start + timedelta(milliseconds=i * 37)}
+        for i in range(count)
+    ]
+
+
+def response_field(path: str, method: str):
+    """The response_model field FastAPI validates the handler result against"""
+    for route in server.app.routes:
+        if getattr(route, "path", None) == path and method in getattr(route, "methods", ()):
+            return route.response_field
+    raise LookupError(f"No route for {method} {path}")
+
+
+async def model_list(field, docs: list) -> bytes:
+    models = [server.StatusCheck(**doc) for doc in docs]
+    content = await serialize_response(field=field, response_content=models)
+    return JSONResponse(content).body
+
+
+async def fast_list(docs: list) -> bytes:
+    return server.dumps(docs)
+
+
+async def model_create(field, client_name: str) -> bytes:
+    input = server.StatusCheckCreate(client_name=client_name)
+    status_obj = server.StatusCheck(**input.dict())
+    status_obj.dict()  # the document that used to be inserted
+    content = await serialize_response(field=field, response_content=status_obj)
+    return JSONResponse(content).body
+
+
+async def fast_create(client_name: str) -> bytes:
+    input = server.StatusCheckCreate(client_name=client_name)
+    return server.dumps(server.new_status_doc(input.client_name))
+
+
+async def time_call(func, *args, duration: float) -> float:
+    """Average microseconds per call over roughly `duration` seconds"""
+    calls = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < duration:
+        await func(*args)
+        calls += 1
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+async def run(sizes: list, duration: float) -> dict:
+    list_field = response_field("/api/status", "GET")
+    create_field = response_field("/api/status", "POST")
+    results = {"encoder": "orjson" if core.orjson is not None else "json", "list": [], "create": {}}
+
+    for size in sizes:
+        docs = make_docs(size)
+        model_body = await model_list(list_field, docs)
+        fast_body = await fast_list(docs)
+        if model_body != fast_body:
+            raise AssertionError(f"Fast path output differs for {size} documents")
+        model_us = await time_call(model_list, list_field, docs, duration=duration)
+        fast_us = await time_call(fast_list, docs, duration=duration)
+        results["list"].append({
+            "documents": size,
+            "bytes": len(fast_body),
+            "model_us": round(model_us, 1),
+            "fast_us": round(fast_us, 1),
+            "speedup": round(model_us / fast_us, 1),
+        })
+
+    model_us = await time_call(model_create, create_field, "bench", duration=duration)
+    fast_us = await time_call(fast_create, "bench", duration=duration)
+    results["create"] = {"model_us": round(model_us, 1), "fast_us": round(fast_us, 1), "speedup": round(model_us / fast_us, 1)}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 1000], help="documents per list response")
+    parser.add_argument("--duration", type=float, default=1.0, help="seconds spent timing each case")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.sizes, args.duration))
+
+    print(f"📊 Serialization ({results['encoder']})")
+    for row in results["list"]:
+        print(f"  list {row['documents']:>6} docs  model {row['model_us']:>10.1f} us  "
+              f"fast {row['fast_us']:>9.1f} us  x{row['speedup']}")
+    create = results["create"]
+    print(f"  create            model {create['model_us']:>10.1f} us  fast {create['fast_us']:>9.1f} us  x{create['speedup']}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
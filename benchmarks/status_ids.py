@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Status Check Id Benchmark
+Inserts the same number of status checks with random (uuid4) and time-ordered
+(uuid7) ids into scratch collections that carry the production indexes, and
+compares insert throughput and the size of the unique id index. Needs a
+MongoDB at MONGO_URL; the scratch collections are dropped afterwards unless
+--keep is given. With --generate-only it just times id generation.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import timeit
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+# core reads its settings at import time, as it does under backend/server.py
+load_dotenv(BACKEND_DIR / ".env")
+
+import core  # noqa: E402
+
+GENERATORS = {
+    "uuid4": lambda: str(uuid.uuid4()),
+    "uuid7": core.uuid7,
+}
+
+
+def generation_us(generate, calls: int = 100000) -> float:
+    return timeit.timeit(generate, number=calls) / calls * 1e6
+
+
+def insert_run(db, id_format: str, count: int, batch_size: int) -> dict:
+    collection = db[f"bench_status_ids_{id_format}"]
+    collection.drop()
+    for name, keys, options in core.STATUS_INDEXES:
+        collection.create_index(keys, name=name, **options)
+    generate = GENERATORS[id_format]
+
+    started = time.perf_counter()
+    for offset in range(0, count, batch_size):
+        collection.insert_many([
+            {"id": generate(), "client_name": f"client-{i % 50}", "timestamp": datetime.utcnow()}
+            for i in range(offset, min(count, offset + batch_size))
+        ], ordered=False)
+    elapsed = time.perf_counter() - started
+
+    stats = next(collection.aggregate([{"$collStats": {"storageStats": {}}}]))["storageStats"]
+    return {
+        "documents": count,
+        "inserts_per_second": round(count / elapsed),
+        "id_index_bytes": stats["indexSizes"]["id_unique"],
+        "total_index_bytes": stats["totalIndexSize"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=1_000_000, help="status checks inserted per id format")
+    parser.add_argument("--batch-size", type=int, default=1000, help="documents per insert_many")
+    parser.add_argument("--generate-only", action="store_true", help="only time id generation")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch collections")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = {"generation_us": {name: round(generation_us(generate), 2) for name, generate in GENERATORS.items()}}
+    print("📊 Id generation: " + ", ".join(f"{name} {us} us" for name, us in results["generation_us"].items()))
+
+    if not args.generate_only:
+        from pymongo import MongoClient
+
+        client = MongoClient(os.environ.get('MONGO_URL', 'mongodb://localhost:27017'))
+        db = client[os.environ.get('DB_NAME', 'portfolio_dev')]
+        results["inserts"] = {}
+        for id_format in GENERATORS:
+            run = results["inserts"][id_format] = insert_run(db, id_format, args.count, args.batch_size)
+            print(f"  {id_format}  {run['inserts_per_second']:>9} inserts/s  "
+                  f"id index {run['id_index_bytes'] / 2**20:8.1f} MiB  all indexes {run['total_index_bytes'] / 2**20:8.1f} MiB")
+            if not args.keep:
+                db[f"bench_status_ids_{id_format}"].drop()
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,18 @@
 #!/usr/bin/env python3
 """
 Local Development Startup Script
-This script starts both the frontend and backend for local development
+This script starts both the frontend and backend for local development.
+Pass --prod to run the backend with the multi-worker production launcher
+(gunicorn + uvicorn workers, see backend/gunicorn.conf.py) instead of --reload.
 """
+import argparse
 import subprocess
 import sys
 import time
 import os
 from pathlib import Path
 
-def start_backend():
+def start_backend(prod=False, workers=None):
     """Start the FastAPI backend server"""
     print("🚀 Starting Backend Server...")
     backend_dir = Path("backend")
@@ -25,11 +28,20 @@ def start_backend():
                       check=True, capture_output=True)
         
         # Start backend server
-        print("🔥 Starting FastAPI server on http://localhost:8000")
-        backend_process = subprocess.Popen([
-            sys.executable, "-m", "uvicorn", "server:app", 
-            "--host", "127.0.0.1", "--port", "8000", "--reload"
-        ], cwd="backend")
+        if prod:
+            env = dict(os.environ, PORT="8000")
+            if workers:
+                env["WEB_CONCURRENCY"] = str(workers)
+            print(f"🔥 Starting FastAPI server on http://localhost:8000 with {workers or os.cpu_count()} workers")
+            backend_process = subprocess.Popen([
+                sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "server:app"
+            ], cwd="backend", env=env)
+        else:
+            print("🔥 Starting FastAPI server on http://localhost:8000")
+            backend_process = subprocess.Popen([
+                sys.executable, "-m", "uvicorn", "server:app",
+                "--host", "127.0.0.1", "--port", "8000", "--reload"
+            ], cwd="backend")
         
         return backend_process
     except Exception as e:
@@ -61,11 +73,16 @@ def start_frontend():
 
 def main():
     """Main startup function"""
+    parser = argparse.ArgumentParser(description="Start the frontend and backend")
+    parser.add_argument("--prod", action="store_true", help="run the backend with gunicorn workers instead of --reload")
+    parser.add_argument("--workers", type=int, help="backend worker count with --prod (default: number of CPUs)")
+    args = parser.parse_args()
+
     print("🎯 Portfolio Website - Local Development Startup")
     print("=" * 50)
     
     # Start backend
-    backend_process = start_backend()
+    backend_process = start_backend(prod=args.prod, workers=args.workers)
     if backend_process:
         print("✅ Backend started successfully!")
     
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The backend modules are imported the way gunicorn and api/index.py import them
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
@@ -0,0 +1,108 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from starlette.datastructures import Headers
+
+import server
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(server.time, "monotonic", clock)
+    return clock
+
+
+def test_bucket_admits_up_to_burst_then_rejects(clock):
+    limiter = server.RateLimiter(rate=10, burst=5, max_keys=100)
+    for _ in range(5):
+        assert limiter.take({"a": 1}) == 0
+    assert limiter.take({"a": 1}) == pytest.approx(0.1)
+
+
+def test_bucket_refills_at_rate(clock):
+    limiter = server.RateLimiter(rate=10, burst=5, max_keys=100)
+    assert limiter.take({"a": 5}) == 0
+    clock.now += 0.2
+    assert limiter.take({"a": 2}) == 0
+    assert limiter.take({"a": 1}) == pytest.approx(0.1)
+    clock.now += 60
+    assert limiter.take({"a": 5}) == 0
+    assert limiter.take({"a": 1}) > 0
+
+
+def test_rejected_request_takes_no_tokens(clock):
+    limiter = server.RateLimiter(rate=10, burst=5, max_keys=100)
+    assert limiter.take({"a": 5}) == 0
+    assert limiter.take({"a": 1, "b": 1}) > 0
+    assert limiter.take({"b": 5}) == 0
+
+
+def test_oversized_request_leaves_bucket_in_debt(clock):
+    limiter = server.RateLimiter(rate=10, burst=5, max_keys=100)
+    assert limiter.take({"a": 8}) == 0
+    assert limiter.take({"a": 1}) == pytest.approx(0.4)
+
+
+def test_concurrency_limiter_rejects_when_queue_is_full():
+    limiter = server.ConcurrencyLimiter(limit=1, queue_size=0, timeout_ms=1000)
+
+    async def run():
+        async with limiter.slot("/api/status"):
+            with pytest.raises(HTTPException) as excinfo:
+                async with limiter.slot("/api/status"):
+                    pass
+        return excinfo.value
+
+    error = asyncio.run(run())
+    assert error.status_code == 503
+    assert error.headers == {"Retry-After": "1"}
+
+
+def test_concurrency_limiter_rejects_after_queue_timeout():
+    limiter = server.ConcurrencyLimiter(limit=1, queue_size=1, timeout_ms=10)
+
+    async def run():
+        async with limiter.slot("/api/status"):
+            with pytest.raises(HTTPException):
+                async with limiter.slot("/api/status"):
+                    pass
+        # The timed-out waiter left the queue and the slot is free again
+        async with limiter.slot("/api/status"):
+            return limiter.waiting
+
+    assert asyncio.run(run()) == 0
+
+
+def request_from(peer, *forwarded):
+    headers = Headers(raw=[(b"x-forwarded-for", value.encode()) for value in forwarded])
+    return SimpleNamespace(headers=headers, client=SimpleNamespace(host=peer))
+
+
+def test_client_address_ignores_forwarded_for_by_default(monkeypatch):
+    monkeypatch.setattr(server, "ADMISSION_TRUSTED_HOPS", 0)
+    assert server.client_address(request_from("10.0.0.1", "1.2.3.4")) == "10.0.0.1"
+
+
+def test_client_address_takes_hop_appended_by_trusted_proxy(monkeypatch):
+    monkeypatch.setattr(server, "ADMISSION_TRUSTED_HOPS", 1)
+    # The client sent "6.6.6.6" itself; the proxy appended the real peer
+    assert server.client_address(request_from("10.0.0.1", "6.6.6.6, 1.2.3.4")) == "1.2.3.4"
+    monkeypatch.setattr(server, "ADMISSION_TRUSTED_HOPS", 2)
+    assert server.client_address(request_from("10.0.0.1", "6.6.6.6, 1.2.3.4", "10.0.0.2")) == "1.2.3.4"
+
+
+def test_client_address_falls_back_to_peer(monkeypatch):
+    monkeypatch.setattr(server, "ADMISSION_TRUSTED_HOPS", 2)
+    assert server.client_address(request_from("10.0.0.1", "1.2.3.4")) == "10.0.0.1"
+    assert server.client_address(request_from("10.0.0.1")) == "10.0.0.1"
@@ -0,0 +1,70 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+from starlette.datastructures import Headers
+
+import core
+
+
+class BodyRequest:
+    def __init__(self, chunks, content_length=None):
+        self.headers = Headers(headers={"content-length": str(content_length)} if content_length is not None else {})
+        self.chunks = chunks
+        self.read = 0
+
+    async def stream(self):
+        for chunk in self.chunks:
+            self.read += 1
+            yield chunk
+
+
+def read(request):
+    return asyncio.run(core.read_batch_body(request))
+
+
+def test_body_within_the_limit_is_read(monkeypatch):
+    monkeypatch.setattr(core, "STATUS_BATCH_MAX_BYTES", 10)
+    assert read(BodyRequest([b"[1,", b"2]"], content_length=5)) == b"[1,2]"
+
+
+def test_oversized_content_length_is_refused_before_reading(monkeypatch):
+    monkeypatch.setattr(core, "STATUS_BATCH_MAX_BYTES", 10)
+    request = BodyRequest([b"x" * 11], content_length=11)
+    with pytest.raises(HTTPException) as excinfo:
+        read(request)
+    assert excinfo.value.status_code == 413
+    assert request.read == 0
+
+
+def test_chunked_body_is_refused_once_over_the_limit(monkeypatch):
+    monkeypatch.setattr(core, "STATUS_BATCH_MAX_BYTES", 10)
+    request = BodyRequest([b"x" * 6, b"x" * 6, b"x" * 6])
+    with pytest.raises(HTTPException) as excinfo:
+        read(request)
+    assert excinfo.value.status_code == 413
+    assert request.read == 2
+
+
+def test_ndjson_lines_are_counted_before_decoding(monkeypatch):
+    monkeypatch.setattr(core, "STATUS_BATCH_MAX", 2)
+
+    def loads(line):
+        raise AssertionError("decoded before the item count was checked")
+
+    monkeypatch.setattr(core.json, "loads", loads)
+    body = b'{"client_name": "a"}\n\n{"client_name": "b"}\n{"client_name": "c"}\n'
+    with pytest.raises(HTTPException) as excinfo:
+        core.parse_batch_body(body, core.NDJSON_MEDIA_TYPE)
+    assert excinfo.value.status_code == 413
+
+
+def test_json_array_over_the_item_limit_is_refused(monkeypatch):
+    monkeypatch.setattr(core, "STATUS_BATCH_MAX", 2)
+    body = json.dumps([{"client_name": name} for name in "abc"]).encode()
+    with pytest.raises(HTTPException) as excinfo:
+        core.parse_batch_body(body, "application/json")
+    assert excinfo.value.status_code == 413
+    body = json.dumps([{"client_name": name} for name in "ab"]).encode()
+    assert len(core.parse_batch_body(body, "application/json")) == 2
@@ -0,0 +1,119 @@
+import pytest
+from fastapi import HTTPException
+from pymongo.errors import OperationFailure, ServerSelectionTimeoutError
+
+import core
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(core.time, "monotonic", clock)
+    return clock
+
+
+def fail(breaker: core.CircuitBreaker):
+    with pytest.raises(ServerSelectionTimeoutError):
+        with breaker.track():
+            raise ServerSelectionTimeoutError("no servers")
+
+
+def test_closed_breaker_lets_calls_through(clock):
+    breaker = core.CircuitBreaker(3, 5000)
+    breaker.check()
+    with breaker.track():
+        pass
+    assert breaker.state == "closed"
+    assert breaker.failures == 0
+
+
+def test_opens_after_failure_threshold(clock):
+    breaker = core.CircuitBreaker(3, 5000)
+    fail(breaker)
+    fail(breaker)
+    assert breaker.state == "closed"
+    breaker.check()
+    fail(breaker)
+    assert breaker.state == "open"
+    with pytest.raises(HTTPException) as raised:
+        breaker.check()
+    assert raised.value.status_code == 503
+    assert raised.value.headers["Retry-After"] == "5"
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = core.CircuitBreaker(3, 5000)
+    fail(breaker)
+    fail(breaker)
+    with breaker.track():
+        pass
+    fail(breaker)
+    assert breaker.state == "closed"
+    assert breaker.failures == 1
+
+
+def test_server_errors_do_not_count_as_failures(clock):
+    breaker = core.CircuitBreaker(1, 5000)
+    with pytest.raises(OperationFailure):
+        with breaker.track():
+            raise OperationFailure("bad query")
+    assert breaker.state == "closed"
+
+
+def test_half_open_after_reset_window_admits_one_probe(clock):
+    breaker = core.CircuitBreaker(1, 5000)
+    fail(breaker)
+    clock.now += 4.9
+    with pytest.raises(HTTPException):
+        breaker.check()
+    clock.now += 0.1
+    breaker.check()
+    assert breaker.state == "half_open"
+    # Only the first caller probes; the rest keep failing fast
+    with pytest.raises(HTTPException):
+        breaker.check()
+
+
+def test_successful_probe_closes_the_circuit(clock):
+    breaker = core.CircuitBreaker(1, 5000)
+    fail(breaker)
+    clock.now += 5
+    breaker.check()
+    with breaker.track():
+        pass
+    assert breaker.state == "closed"
+    assert breaker.last_error is None
+    breaker.check()
+
+
+def test_failed_probe_reopens_the_circuit(clock):
+    breaker = core.CircuitBreaker(3, 5000)
+    for _ in range(3):
+        fail(breaker)
+    clock.now += 5
+    breaker.check()
+    fail(breaker)
+    assert breaker.state == "open"
+    assert breaker.opened_at == clock.now
+    with pytest.raises(HTTPException):
+        breaker.check()
+
+
+def test_cancelled_probe_lets_the_next_caller_probe(clock):
+    breaker = core.CircuitBreaker(1, 5000)
+    fail(breaker)
+    clock.now += 5
+    breaker.check()
+    with pytest.raises(KeyboardInterrupt):
+        with breaker.track():
+            raise KeyboardInterrupt
+    breaker.check()
+    assert breaker.probing
@@ -0,0 +1,71 @@
+import asyncio
+import gzip
+
+import core
+
+
+def run(app, accept_encoding="gzip", sent=None):
+    sent = [] if sent is None else sent
+    middleware = core.CompressionMiddleware(app, core.Metrics())
+    scope = {"type": "http", "method": "GET", "headers": [(b"accept-encoding", accept_encoding.encode())]}
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(middleware(scope, receive, send))
+    return sent
+
+
+def response_app(content_type, chunks, content_length=True):
+    async def app(scope, receive, send):
+        headers = [(b"content-type", content_type.encode())]
+        if content_length:
+            headers.append((b"content-length", str(sum(map(len, chunks))).encode()))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        for index, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": index < len(chunks) - 1})
+    return app
+
+
+def header(message, name):
+    return dict(message["headers"]).get(name.encode())
+
+
+def test_large_body_is_compressed():
+    body = b'{"a": 1}' * 1000
+    start, message = run(response_app("application/json", [body]))
+    assert header(start, "content-encoding") == b"gzip"
+    assert header(start, "content-length") is None
+    assert gzip.decompress(message["body"]) == body
+
+
+def test_small_body_is_sent_as_is():
+    start, message = run(response_app("application/json", [b'{"a": 1}']))
+    assert header(start, "content-encoding") is None
+    assert message["body"] == b'{"a": 1}'
+
+
+def test_stream_is_compressed_chunk_by_chunk():
+    chunks = [b'{"a": 1}\n', b'{"a": 2}\n']
+    start, *messages = run(response_app("application/x-ndjson", chunks, content_length=False))
+    assert header(start, "content-encoding") == b"gzip"
+    assert gzip.decompress(b"".join(message["body"] for message in messages)) == b"".join(chunks)
+
+
+def test_event_stream_headers_are_not_held_back():
+    messages = []
+    seen = []
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/event-stream")]})
+        # The client has the headers before the first event is produced
+        seen.append(len(messages))
+        await send({"type": "http.response.body", "body": b": ping\n\n", "more_body": False})
+
+    run(app, sent=messages)
+    assert seen == [1]
+    assert header(messages[0], "content-encoding") is None
+    assert messages[1]["body"] == b": ping\n\n"
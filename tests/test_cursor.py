@@ -0,0 +1,66 @@
+import asyncio
+import base64
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+import server
+from core import decode_cursor, encode_cursor, new_status_doc, status_query
+
+
+def test_cursor_round_trips():
+    status_doc = new_status_doc("client")
+    assert decode_cursor(encode_cursor(status_doc)) == (status_doc["timestamp"], status_doc["id"])
+
+
+def test_cursor_with_an_offset_is_read_as_utc():
+    status_doc = new_status_doc("client")
+    raw = f"{status_doc['timestamp'].replace(tzinfo=timezone.utc).astimezone(timezone(timedelta(hours=2))).isoformat()}|{status_doc['id']}"
+    cursor = base64.urlsafe_b64encode(raw.encode()).decode()
+    assert decode_cursor(cursor) == (status_doc["timestamp"], status_doc["id"])
+
+
+def truncated(cursor: str) -> list:
+    return [cursor[:length] for length in (1, 10, 30, len(cursor) - 5, len(cursor) - 1)]
+
+
+@pytest.mark.parametrize("cursor", [
+    "garbage",
+    "!!!!",
+    "not|base64",
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    base64.urlsafe_b64encode(b"no separator").decode(),
+    base64.urlsafe_b64encode(b"2024-01-01T00:00:00|not-a-uuid").decode(),
+    base64.urlsafe_b64encode(b"yesterday|00000000-0000-4000-8000-000000000000").decode(),
+    *truncated(encode_cursor(new_status_doc("client"))),
+])
+def test_invalid_cursor_is_a_bad_request(cursor):
+    with pytest.raises(HTTPException) as excinfo:
+        status_query(after=cursor)
+    assert excinfo.value.status_code == 400
+
+
+def test_paging_is_stable_when_timestamps_tie(tmp_path, monkeypatch):
+    store = server.EmbeddedStatusStore(tmp_path / "status_checks.log", 0)
+    monkeypatch.setattr(server, "status_store", store)
+    timestamp = datetime(2024, 1, 1)
+    status_docs = [dict(new_status_doc(f"client-{i % 3}"), timestamp=timestamp) for i in range(25)]
+
+    async def read_all_pages():
+        await store.open()
+        await store.insert(status_docs)
+        pages, after = [], None
+        while True:
+            status_checks, next_cursor = await server.load_status_page(status_query(after=after), 4)
+            pages.append([doc["id"] for doc in status_checks])
+            if next_cursor is None:
+                break
+            after = next_cursor
+        await store.close()
+        return pages
+
+    pages = asyncio.run(read_all_pages())
+    ids = [status_id for page in pages for status_id in page]
+    assert ids == sorted(doc["id"] for doc in status_docs)
+    assert len(pages) == 7
@@ -0,0 +1,131 @@
+import asyncio
+import random
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+import server
+from core import STATUS_SORT, encode_cursor, status_filter, status_query
+
+
+def matches(doc, query):
+    # The subset of MongoDB query semantics status_filter produces
+    for field, condition in query.items():
+        if field == "$and":
+            if not all(matches(doc, part) for part in condition):
+                return False
+        elif field == "$or":
+            if not any(matches(doc, part) for part in condition):
+                return False
+        elif isinstance(condition, dict):
+            operators = {"$gt": lambda a, b: a > b, "$gte": lambda a, b: a >= b, "$lt": lambda a, b: a < b}
+            if not all(operators[op](doc[field], value) for op, value in condition.items()):
+                return False
+        elif doc[field] != condition:
+            return False
+    return True
+
+
+def mongo_find(docs, query, limit):
+    found = [doc for doc in docs if matches(doc, status_filter(query))]
+    found.sort(key=lambda doc: tuple(doc[field] for field, _ in STATUS_SORT))
+    return found[:limit]
+
+
+def make_docs(count):
+    # Few distinct timestamps, so many status checks tie and the id decides
+    rng = random.Random(7)
+    start = datetime(2024, 1, 1)
+    return [
+        {
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "client_name": rng.choice(["a", "b", "c"]),
+            "timestamp": start + timedelta(milliseconds=rng.randrange(20) * 250),
+        }
+        for _ in range(count)
+    ]
+
+
+def open_store(path):
+    store = server.EmbeddedStatusStore(path, 0)
+    asyncio.run(store.open())
+    return store
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = open_store(tmp_path / "status_checks.log")
+    yield store
+    asyncio.run(store.close())
+
+
+QUERIES = [
+    {},
+    {"client_name": "a"},
+    {"since": datetime(2024, 1, 1, 0, 0, 1)},
+    {"until": datetime(2024, 1, 1, 0, 0, 3)},
+    {"client_name": "b", "since": datetime(2024, 1, 1, 0, 0, 1), "until": datetime(2024, 1, 1, 0, 0, 4)},
+]
+
+
+@pytest.mark.parametrize("filters", QUERIES)
+def test_filters_match_mongo(store, filters):
+    docs = make_docs(200)
+    asyncio.run(store.insert(docs))
+    query = status_query(**filters)
+    assert store.read(query, 1000) == mongo_find(docs, query, 1000)
+
+
+@pytest.mark.parametrize("filters", QUERIES)
+def test_cursor_pages_match_mongo(store, filters):
+    docs = make_docs(200)
+    asyncio.run(store.insert(docs))
+    after = None
+    seen = []
+    while True:
+        query = status_query(after=after, **filters)
+        page = store.read(query, 7)
+        assert page == mongo_find(docs, query, 7)
+        if not page:
+            break
+        seen.extend(page)
+        after = encode_cursor(page[-1])
+    assert seen == mongo_find(docs, status_query(**filters), 1000)
+
+
+def test_replay_drops_a_truncated_append(tmp_path):
+    path = tmp_path / "status_checks.log"
+    store = open_store(path)
+    docs = make_docs(5)
+    asyncio.run(store.insert(docs))
+    asyncio.run(store.close())
+    with open(path, "ab") as file:
+        file.write(b'{"id": "cut short", "client_na')
+
+    store = open_store(path)
+    assert len(store.documents) == 5
+    assert path.read_bytes().endswith(b"\n")
+    # Writes after the recovery start on a line of their own
+    asyncio.run(store.insert(make_docs(6)[5:]))
+    asyncio.run(store.close())
+
+    store = open_store(path)
+    assert len(store.documents) == 6
+    asyncio.run(store.close())
+
+
+def test_duplicate_ids_are_rejected(store):
+    docs = make_docs(3)
+    asyncio.run(store.insert(docs[:2]))
+    write_errors = asyncio.run(store.insert(docs[1:]))
+    assert list(write_errors) == [0]
+    assert len(store.documents) == 3
+
+
+@pytest.mark.skipif(server.fcntl is None, reason="flock is not available")
+def test_log_is_locked_to_one_process(store):
+    other = server.EmbeddedStatusStore(store.path, 0)
+    with pytest.raises(RuntimeError):
+        asyncio.run(other.open())
+    assert not other.available()
@@ -0,0 +1,28 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+
+import server
+from core import dumps
+
+pytest.importorskip("pyarrow")
+pytest.importorskip("pandas")
+
+
+def test_csv_timestamps_match_the_json_api():
+    status_docs = [
+        {"id": "a", "client_name": "client", "timestamp": datetime(2024, 1, 1, 12, 30, 5, 123000)},
+        # A whole second, which isoformat writes without a fraction
+        {"id": "b", "client_name": "client", "timestamp": datetime(2024, 1, 1, 12, 30, 6)},
+        # The embedded store keeps microseconds
+        {"id": "c", "client_name": "client", "timestamp": datetime(2024, 1, 1, 0, 0, 0, 1)},
+        {"id": "d", "client_name": "client", "timestamp": datetime(1999, 12, 31, 23, 59, 59, 999999)},
+    ]
+    encoder = server.ExportEncoder("csv")
+    columns = {field: [doc[field] for doc in status_docs] for field in server.STATUS_FIELDS}
+    data = encoder.encode(columns) + encoder.close()
+    rows = list(csv.DictReader(io.StringIO(data.decode())))
+    assert [row["timestamp"] for row in rows] == [json.loads(dumps(doc))["timestamp"] for doc in status_docs]
@@ -0,0 +1,89 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from pymongo.errors import OperationFailure, ServerSelectionTimeoutError
+
+import core
+import server
+
+
+class Collection:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.created = []
+
+    async def create_index(self, keys, name, **options):
+        if self.failures:
+            self.failures -= 1
+            raise ServerSelectionTimeoutError("no servers")
+        self.created.append(name)
+
+    async def drop_index(self, name):
+        if name not in self.created:
+            raise OperationFailure("index not found", code=core.INDEX_NOT_FOUND)
+        self.created.remove(name)
+
+
+def test_index_setup_reports_whether_every_index_exists():
+    db = SimpleNamespace(status_checks=Collection(failures=1), status_rollups=Collection())
+    assert asyncio.run(core.create_status_indexes(db)) is False
+    assert asyncio.run(core.create_status_indexes(db)) is True
+    assert db.status_checks.created[-len(core.STATUS_INDEXES):] == [name for name, _, _ in core.STATUS_INDEXES]
+
+
+def test_monitor_retries_index_setup_until_it_succeeds(monkeypatch):
+    attempts = []
+
+    async def ping_mongo():
+        return True
+
+    async def ensure_status_indexes():
+        attempts.append(1)
+        server.indexes_ready = len(attempts) >= 3
+
+    monkeypatch.setattr(server, "MONGO_HEALTH_INTERVAL_MS", 1)
+    monkeypatch.setattr(server, "mongo_health", dict(server.mongo_health, warmed_up=True))
+    monkeypatch.setattr(server, "mongo_breaker", core.CircuitBreaker(3, 5000))
+    monkeypatch.setattr(server, "ping_mongo", ping_mongo)
+    monkeypatch.setattr(server, "ensure_status_indexes", ensure_status_indexes)
+    monkeypatch.setattr(server, "indexes_ready", False)
+    monkeypatch.setattr(server, "status_index_task", None)
+
+    async def run():
+        monitor = asyncio.create_task(server.monitor_mongo())
+        await asyncio.sleep(0.1)
+        monitor.cancel()
+
+    asyncio.run(run())
+    assert len(attempts) == 3
+    assert server.indexes_ready
+
+
+def test_not_ready_without_indexes(monkeypatch):
+    monkeypatch.setattr(server, "status_store", server.MongoStatusStore())
+    monkeypatch.setattr(server, "mongo_available", True)
+    monkeypatch.setattr(server, "db", SimpleNamespace())
+    monkeypatch.setattr(server, "mongo_health", dict(server.mongo_health, warmed_up=True))
+    monkeypatch.setattr(server, "mongo_breaker", core.CircuitBreaker(3, 5000))
+    monkeypatch.setattr(server, "mongo_pool_stats", SimpleNamespace(snapshot=lambda: {}))
+
+    monkeypatch.setattr(server, "indexes_ready", False)
+    response = asyncio.run(server.readiness())
+    assert response.status_code == 503
+    monkeypatch.setattr(server, "indexes_ready", True)
+    response = asyncio.run(server.readiness())
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("retention", ["none", "archive"])
+def test_retention_without_ttl_drops_the_ttl_index(monkeypatch, retention):
+    collection = Collection()
+    collection.created.append(core.TTL_INDEX)
+    monkeypatch.setattr(server, "STATUS_RETENTION", retention)
+    monkeypatch.setattr(server, "STATUS_ARCHIVE_TARGET", "file")
+    monkeypatch.setattr(server, "db", SimpleNamespace(status_checks=collection))
+    asyncio.run(server.ensure_retention())
+    assert collection.created == []
+    # Already dropped, which is not an error
+    asyncio.run(server.ensure_retention())
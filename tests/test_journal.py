@@ -0,0 +1,227 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+import server
+from core import DUPLICATE_KEY, new_status_doc
+
+
+class MemoryStore:
+    # Stands in for MongoDB: ids are unique, and set fail=True to take it down
+    def __init__(self):
+        self.docs = {}
+        self.fail = False
+
+    async def insert(self, status_docs):
+        if self.fail:
+            raise ConnectionError("database is down")
+        write_errors = {}
+        for index, doc in enumerate(status_docs):
+            if doc["id"] in self.docs:
+                write_errors[index] = {"index": index, "code": DUPLICATE_KEY, "errmsg": "duplicate key"}
+            else:
+                self.docs[doc["id"]] = doc
+        return write_errors
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = MemoryStore()
+    written = []
+
+    async def status_docs_written(status_docs):
+        written.extend(doc["id"] for doc in status_docs)
+
+    monkeypatch.setattr(server, "status_store", store)
+    monkeypatch.setattr(server, "status_docs_written", status_docs_written)
+    store.written = written
+    return store
+
+
+def open_journal(path, max_bytes=1 << 20):
+    journal = server.StatusJournal(path, max_bytes, 0)
+    assert journal.try_open()
+    return journal
+
+
+def journaled(journal, count):
+    status_docs = [new_status_doc(f"client-{i}") for i in range(count)]
+    assert asyncio.run(journal.append(status_docs, "unavailable")) == {}
+    return status_docs
+
+
+def test_incomplete_record_is_truncated_on_open(tmp_path):
+    path = tmp_path / "status_checks-0.journal"
+    journal = open_journal(path)
+    journaled(journal, 2)
+    size = journal.size
+    journal.close()
+    with open(path, "ab") as file:
+        file.write(b'{"id": "cut sh')
+    journal = open_journal(path)
+    assert journal.depth == 2
+    assert journal.size == size == path.stat().st_size
+
+
+def test_full_journal_rejects_writes(tmp_path):
+    journal = open_journal(tmp_path / "status_checks-0.journal", max_bytes=200)
+    journaled(journal, 1)
+    with pytest.raises(HTTPException) as excinfo:
+        journaled(journal, 5)
+    assert excinfo.value.status_code == 503
+    assert excinfo.value.headers == {"Retry-After": "5"}
+    assert journal.depth == 1
+
+
+def test_oversized_status_check_is_refused(tmp_path):
+    journal = open_journal(tmp_path / "status_checks-0.journal")
+    status_docs = [new_status_doc("x" * server.JOURNAL_READ_BYTES), new_status_doc("ok")]
+    write_errors = asyncio.run(journal.append(status_docs, "unavailable"))
+    assert list(write_errors) == [0]
+    assert journal.depth == 1
+
+
+def test_oversized_record_is_skipped_by_replay(tmp_path, store):
+    path = tmp_path / "status_checks-0.journal"
+    status_doc = new_status_doc("ok")
+    path.write_bytes(b'{"id": "' + b"x" * (2 * server.JOURNAL_READ_BYTES) + b'"}\n' + server.dumps(status_doc) + b"\n")
+    journal = open_journal(path)
+    assert journal.depth == 2
+    asyncio.run(journal.replay(10))
+    assert list(store.docs) == [status_doc["id"]]
+    assert journal.depth == 0
+
+
+def test_replay_follows_up_on_inserts_that_landed(tmp_path, store):
+    journal = open_journal(tmp_path / "status_checks-0.journal")
+    status_docs = journaled(journal, 3)
+    # The insert timed out, so the write was journaled, but it still landed
+    store.docs[status_docs[1]["id"]] = status_docs[1]
+    asyncio.run(journal.replay(10))
+    assert len(store.docs) == 3
+    assert store.written == [doc["id"] for doc in status_docs]
+    assert journal.size == journal.depth == 0
+    asyncio.run(journal.replay(10))
+    assert len(store.written) == 3
+
+
+def test_restart_resumes_replay_where_it_stopped(tmp_path, store):
+    path = tmp_path / "status_checks-0.journal"
+    journal = open_journal(path)
+    status_docs = journaled(journal, 4)
+    real_insert = store.insert
+    batches = []
+
+    async def insert_then_fail(docs):
+        if batches:
+            store.fail = True
+        batches.append(docs)
+        return await real_insert(docs)
+
+    store.insert = insert_then_fail
+    with pytest.raises(ConnectionError):
+        asyncio.run(journal.replay(2))
+    journal.close()
+
+    store.insert, store.fail = real_insert, False
+    journal = open_journal(path)
+    assert journal.depth == 2
+    asyncio.run(journal.replay(2))
+    # Every status check is stored and followed up exactly once
+    assert store.written == [doc["id"] for doc in status_docs]
+    assert not journal.offset_path.exists()
+
+
+def test_orphaned_journal_is_taken_over(tmp_path, store, monkeypatch):
+    monkeypatch.setattr(server, "STATUS_JOURNAL_DIR", tmp_path)
+    orphan = open_journal(tmp_path / "status_checks-3.journal")
+    status_docs = journaled(orphan, 2)
+    orphan.close()
+
+    own = open_journal(tmp_path / "status_checks-0.journal")
+    monkeypatch.setattr(server, "status_journal", own)
+    asyncio.run(server.replay_orphaned_journals())
+    assert sorted(store.docs) == sorted(doc["id"] for doc in status_docs)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["status_checks-0.journal"]
+
+
+def test_locked_journal_is_left_to_its_worker(tmp_path, store, monkeypatch):
+    monkeypatch.setattr(server, "STATUS_JOURNAL_DIR", tmp_path)
+    other = open_journal(tmp_path / "status_checks-3.journal")
+    journaled(other, 2)
+
+    own = open_journal(tmp_path / "status_checks-0.journal")
+    monkeypatch.setattr(server, "status_journal", own)
+    asyncio.run(server.replay_orphaned_journals())
+    assert store.docs == {}
+    assert other.depth == 2
+
+
+def test_unreadable_records_are_skipped_by_replay(tmp_path, store):
+    path = tmp_path / "status_checks-0.journal"
+    first, last = new_status_doc("first"), new_status_doc("last")
+    path.write_bytes(
+        server.dumps(first) + b"\n"
+        + b"not json\n"
+        + b'{"id": "x", "client_name": "c", "timestamp": "yesterday"}\n'
+        + b'{"client_name": "no id", "timestamp": "2024-01-01T00:00:00"}\n'
+        + b"[1, 2]\n"
+        + server.dumps(last) + b"\n"
+    )
+    journal = open_journal(path)
+    assert journal.depth == 6
+    asyncio.run(journal.replay(3))
+    assert list(store.docs) == [first["id"], last["id"]]
+    assert journal.depth == journal.size == 0
+
+
+class ShortWriteFile:
+    # Writes only part of the data, as an unbuffered write can on ENOSPC
+    def __init__(self, file):
+        self.file = file
+
+    def write(self, data):
+        return self.file.write(data[:len(data) // 2])
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+
+def test_short_append_is_cut_back_and_refused(tmp_path, store):
+    path = tmp_path / "status_checks-0.journal"
+    journal = open_journal(path)
+    status_docs = journaled(journal, 1)
+    size = journal.size
+    real_file = journal.file
+    journal.file = ShortWriteFile(real_file)
+    with pytest.raises(HTTPException) as excinfo:
+        journaled(journal, 2)
+    assert excinfo.value.status_code == 503
+    assert journal.size == size == path.stat().st_size
+    assert journal.depth == 1
+
+    journal.file = real_file
+    status_docs += journaled(journal, 1)
+    asyncio.run(journal.replay(10))
+    assert sorted(store.docs) == sorted(doc["id"] for doc in status_docs)
+
+
+def test_limit_counts_only_what_is_left_to_replay(tmp_path, store):
+    record_size = len(server.dumps(new_status_doc("client-0"))) + 1
+    journal = open_journal(tmp_path / "status_checks-0.journal", max_bytes=2 * record_size)
+    journaled(journal, 2)
+    real_insert = store.insert
+
+    async def insert_then_fail(docs):
+        write_errors = await real_insert(docs)
+        store.fail = True
+        return write_errors
+
+    store.insert = insert_then_fail
+    # The second batch fails, so the file keeps both records but one is replayed
+    with pytest.raises(ConnectionError):
+        asyncio.run(journal.replay(1))
+    assert journal.depth == 1
+    journaled(journal, 1)
+    assert journal.depth == 2
@@ -0,0 +1,18 @@
+import logging
+import sys
+
+import pytest
+
+import server
+
+
+@pytest.mark.parametrize("access_log", [True, False])
+def test_uvicorn_access_log_goes_through_the_queue(monkeypatch, access_log):
+    uvicorn_access = logging.getLogger("uvicorn.access")
+    monkeypatch.setattr(uvicorn_access, "handlers", [logging.StreamHandler(sys.stdout)])
+    monkeypatch.setattr(uvicorn_access, "disabled", False)
+    monkeypatch.setattr(server, "ACCESS_LOG", access_log)
+    server.route_server_logs()
+    assert uvicorn_access.handlers == [server.log_queue_handler]
+    # Ours replaces it when on; otherwise uvicorn's lines are the access log
+    assert uvicorn_access.disabled is access_log
@@ -0,0 +1,92 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import core
+import server
+from core import ResponseCache, new_status_doc, page_response, status_query
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(core.time, "monotonic", clock)
+    return clock
+
+
+def request(if_none_match=None):
+    return SimpleNamespace(headers={"if-none-match": if_none_match} if if_none_match else {})
+
+
+def test_matching_etag_is_not_modified():
+    page = ResponseCache(2000, 8).render([new_status_doc("client")], "next")
+    response = page_response(page, request(page.etag))
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == page.etag
+    assert response.headers["x-next-cursor"] == "next"
+    assert page_response(page, request('"other"')).status_code == 200
+
+
+@pytest.mark.parametrize("if_none_match", ["W/{etag}", '"other", W/{etag}', " {etag} ,\"other\"", "*"])
+def test_weak_and_listed_tags_match(if_none_match):
+    page = ResponseCache(2000, 8).render([new_status_doc("client")], None)
+    assert page_response(page, request(if_none_match.format(etag=page.etag))).status_code == 304
+
+
+def test_etag_covers_the_next_cursor():
+    cache = ResponseCache(2000, 8)
+    status_checks = [new_status_doc("client")]
+    assert cache.render(status_checks, None).etag != cache.render(status_checks, "next").etag
+
+
+def test_least_recently_used_page_is_evicted(clock):
+    cache = ResponseCache(2000, 2)
+    for key in ("a", "b"):
+        cache.set(key, cache.render([], key), cache.generation)
+    assert cache.get("a") is not None
+    cache.set("c", cache.render([], "c"), cache.generation)
+    assert list(cache.entries) == ["a", "c"]
+
+
+def test_pages_expire_after_the_ttl(clock):
+    cache = ResponseCache(2000, 8)
+    cache.set("a", cache.render([], None), cache.generation)
+    clock.now += 1.999
+    assert cache.get("a") is not None
+    clock.now += 0.001
+    assert cache.get("a") is None
+    assert cache.entries == {}
+
+
+def test_ttl_of_zero_disables_the_cache():
+    cache = ResponseCache(0, 8)
+    cache.set("a", cache.render([], None), cache.generation)
+    assert cache.entries == {}
+
+
+def test_read_that_raced_a_write_is_not_cached(monkeypatch):
+    cache = ResponseCache(2000, 8)
+    stale = [new_status_doc("before")]
+
+    async def load_status_page(query, limit):
+        # A write lands while the query is in flight
+        cache.invalidate()
+        return stale, None
+
+    monkeypatch.setattr(server, "status_cache", cache)
+    monkeypatch.setattr(server, "load_status_page", load_status_page)
+    key = (10, None, None, None, None)
+    page = asyncio.run(server.load_cached_page(key, status_query(), 10, cache.generation))
+    # The reader still gets its page, but the next read queries again
+    assert page.body == server.dumps(stale)
+    assert cache.get(key) is None
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+import server
+
+
+@pytest.fixture
+def flights(monkeypatch):
+    monkeypatch.setattr(server, "STATUS_SINGLE_FLIGHT", True)
+    return server.SingleFlight("/api/status")
+
+
+def test_identical_reads_share_one_query(flights):
+    queries = []
+
+    async def load():
+        queries.append(1)
+        await asyncio.sleep(0.01)
+        return "page"
+
+    async def run():
+        return await asyncio.gather(*[flights.do(("page", None), load) for _ in range(10)])
+
+    assert asyncio.run(run()) == ["page"] * 10
+    assert len(queries) == 1
+    assert flights.calls == {}
+
+
+def test_different_reads_are_not_shared(flights):
+    queries = []
+
+    async def load(key):
+        queries.append(key)
+        await asyncio.sleep(0.01)
+        return key
+
+    async def run():
+        return await asyncio.gather(*[flights.do(key, lambda key=key: load(key)) for key in ("a", "b", "a")])
+
+    assert asyncio.run(run()) == ["a", "b", "a"]
+    assert sorted(queries) == ["a", "b"]
+
+
+def test_leader_failure_reaches_every_follower(flights):
+    queries = []
+
+    async def load():
+        queries.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("database is down")
+
+    async def run():
+        return await asyncio.gather(*[flights.do("key", load) for _ in range(5)], return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert len(queries) == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    # The failure is not cached; the next read queries again
+    assert flights.calls == {}
+
+
+def test_cancelled_leader_does_not_cancel_followers(flights):
+    async def load():
+        await asyncio.sleep(0.02)
+        return "page"
+
+    async def run():
+        leader = asyncio.ensure_future(flights.do("key", load))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flights.do("key", load))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(run()) == "page"
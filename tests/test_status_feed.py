@@ -0,0 +1,174 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from pymongo.errors import OperationFailure, ServerSelectionTimeoutError
+
+import core
+import server
+
+
+class Watch:
+    def __init__(self, error):
+        self.error = error
+
+    async def __aenter__(self):
+        raise self.error
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+@pytest.fixture
+def database(monkeypatch):
+    def use(error):
+        collection = SimpleNamespace(watch=lambda **options: Watch(error))
+        monkeypatch.setattr(server, "db", SimpleNamespace(status_checks=collection))
+    monkeypatch.setattr(server, "mongo_available", True)
+    monkeypatch.setattr(server, "status_feed_source", None)
+    monkeypatch.setattr(server, "mongo_breaker", core.CircuitBreaker(3, 5000))
+    monkeypatch.setattr(server, "mongo_op", core.MongoOpRecorder(server.mongo_breaker, core.Metrics()))
+    return use
+
+
+def test_standalone_server_falls_back_to_pubsub(database):
+    database(OperationFailure("The $changeStream stage is only supported on replica sets"))
+    assert asyncio.run(server.resolve_feed_source()) == "pubsub"
+    assert server.status_feed_source == "pubsub"
+    assert server.mongo_breaker.failures == 0
+
+
+def test_unreachable_database_counts_against_the_breaker(database):
+    database(ServerSelectionTimeoutError("no servers"))
+    assert asyncio.run(server.resolve_feed_source()) == "pubsub"
+    # Probed again on the next feed instead of settling on pubsub for good
+    assert server.status_feed_source is None
+    assert server.mongo_breaker.failures == 1
+
+
+def test_feeds_of_both_sources_share_the_cap(monkeypatch):
+    async def events():
+        yield b": heartbeat\n\n"
+
+    async def run():
+        change_stream = server.counted_feed(events())
+        pubsub = server.counted_feed(events())
+        await change_stream.__anext__()
+        await pubsub.__anext__()
+        open_feeds = server.status_feed_count
+        monkeypatch.setattr(server, "STATUS_FEED_MAX_SUBSCRIBERS", 2)
+        with pytest.raises(HTTPException) as excinfo:
+            await server.status_feed(SimpleNamespace(headers={}), None)
+        await change_stream.aclose()
+        await pubsub.aclose()
+        return open_feeds, excinfo.value.status_code
+
+    assert asyncio.run(run()) == (2, 503)
+    assert server.status_feed_count == 0
+
+
+def test_open_circuit_falls_back_to_pubsub(database, monkeypatch):
+    database(AssertionError("not probed while the circuit is open"))
+    monkeypatch.setattr(server, "status_feed_source", "change_stream")
+    for _ in range(3):
+        server.mongo_breaker.record_failure(ConnectionError("no servers"))
+    assert asyncio.run(server.resolve_feed_source()) == "pubsub"
+    assert server.status_feed_source == "change_stream"
+
+
+class ChangeStream:
+    def __init__(self, status_docs):
+        self.changes = [{"fullDocument": doc} for doc in status_docs]
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def try_next(self):
+        return self.changes.pop(0) if self.changes else None
+
+    async def close(self):
+        self.closed = True
+
+
+class FeedStore:
+    def __init__(self, status_docs):
+        self.status_docs = status_docs
+        self.queries = []
+
+    def available(self):
+        return True
+
+    async def find(self, query, limit, operation):
+        self.queries.append(query)
+        return [doc for doc in self.status_docs if (doc["timestamp"], doc["id"]) > query.after][:limit]
+
+
+def event_ids(events, count):
+    async def run():
+        ids = []
+        async for event in events:
+            if event.startswith(b"id: "):
+                ids.append(event.split(b"\n", 1)[0][4:].decode())
+            if len(ids) == count:
+                break
+        await events.aclose()
+        return ids
+    return asyncio.run(run())
+
+
+def use_watch(monkeypatch, stream, error=None):
+    # The first watch fails with error, if one is given, as a bad resume token does
+    watches = []
+
+    def watch(pipeline, **options):
+        watches.append(options)
+        if error and len(watches) == 1:
+            return Watch(error)
+        return stream
+
+    monkeypatch.setattr(server, "db", SimpleNamespace(status_checks=SimpleNamespace(watch=watch)))
+    return watches
+
+
+def test_change_stream_catches_up_from_a_cursor(monkeypatch):
+    status_docs = [core.new_status_doc(f"client-{i}") for i in range(3)]
+    live = core.new_status_doc("live")
+    monkeypatch.setattr(server, "status_store", FeedStore(status_docs))
+    # The stream opens before the catch-up read, so it repeats the last status check
+    stream = ChangeStream([status_docs[2], live])
+    watches = use_watch(monkeypatch, stream)
+    ids = event_ids(server.change_stream_feed(None, core.encode_cursor(status_docs[0])), 3)
+    assert ids == [core.encode_cursor(doc) for doc in (status_docs[1], status_docs[2], live)]
+    assert "resume_after" not in watches[0]
+    assert stream.closed
+
+
+def test_change_stream_starts_from_now_when_a_token_is_rejected(monkeypatch):
+    live = core.new_status_doc("live")
+    stream = ChangeStream([live])
+    watches = use_watch(monkeypatch, stream, OperationFailure("cannot resume"))
+    ids = event_ids(server.change_stream_feed(None, "8263A1B2C3000000012B"), 1)
+    assert ids == [core.encode_cursor(live)]
+    assert watches[0]["resume_after"] == {"_data": "8263A1B2C3000000012B"}
+    assert "resume_after" not in watches[1]
+
+
+def test_pubsub_ignores_a_resume_token(monkeypatch):
+    store = FeedStore([])
+    monkeypatch.setattr(server, "status_store", store)
+    live = dict(core.new_status_doc("live"), timestamp=datetime(2024, 1, 1, 12))
+
+    async def run():
+        events = server.pubsub_feed(None, "8263A1B2C3000000012B")
+        first = asyncio.ensure_future(events.__anext__())
+        await asyncio.sleep(0)
+        server.status_broker.publish([live])
+        event = await first
+        await events.aclose()
+        return event
+
+    assert asyncio.run(run()).startswith(b"id: " + core.encode_cursor(live).encode())
+    assert store.queries == []
@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from starlette.datastructures import Headers
+
+import core
+
+
+def buckets(count):
+    start = datetime(2024, 1, 1)
+    return [{"bucket": start + timedelta(hours=i), "client_name": f"client-{i % 2}", "count": 1} for i in range(count)]
+
+
+def test_stats_within_the_cap_are_complete(monkeypatch):
+    monkeypatch.setattr(core, "STATS_MAX_BUCKETS", 3)
+    stats = core.status_stats("hour", buckets(3))
+    assert not stats.truncated
+    assert stats.total == 3
+    assert stats.clients == {"client-0": 2, "client-1": 1}
+
+
+def test_stats_over_the_cap_are_reported_as_truncated(monkeypatch):
+    monkeypatch.setattr(core, "STATS_MAX_BUCKETS", 3)
+    stats = core.status_stats("hour", buckets(4))
+    assert stats.truncated
+    assert len(stats.buckets) == 3
+    assert stats.total == 3
+
+
+@pytest.mark.parametrize("token", [None, "", "wrong"])
+def test_rebuild_requires_the_token(monkeypatch, token):
+    monkeypatch.setattr(core, "STATS_REBUILD_TOKEN", "secret")
+    headers = Headers(headers={"x-rebuild-token": token} if token is not None else {})
+    with pytest.raises(HTTPException) as excinfo:
+        core.check_rebuild_token(SimpleNamespace(headers=headers))
+    assert excinfo.value.status_code == 403
+
+
+def test_rebuild_accepts_the_token(monkeypatch):
+    monkeypatch.setattr(core, "STATS_REBUILD_TOKEN", "secret")
+    core.check_rebuild_token(SimpleNamespace(headers=Headers(headers={"x-rebuild-token": "secret"})))
+
+
+def test_rebuild_route_is_off_by_default():
+    import server
+    assert core.STATS_REBUILD_TOKEN == ""
+    assert "/api/status/stats/rebuild" not in {route.path for route in server.app.routes}
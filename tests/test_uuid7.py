@@ -0,0 +1,65 @@
+import uuid
+
+import pytest
+
+import core
+
+
+class Clock:
+    def __init__(self):
+        self.now_ms = 1_700_000_000_000
+
+    def __call__(self) -> int:
+        return self.now_ms * 1_000_000
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(core.time, "time_ns", clock)
+    return clock
+
+
+def timestamp_ms(value: str) -> int:
+    return uuid.UUID(value).int >> 80
+
+
+def test_ids_are_version_7_with_the_rfc_variant(clock):
+    value = uuid.UUID(core.UUID7Generator()())
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+    assert value.int >> 80 == clock.now_ms
+
+
+def test_ids_increase_within_one_millisecond(clock):
+    generate = core.UUID7Generator()
+    ids = [generate() for _ in range(10000)]
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    # The counter overflows into the next millisecond rather than wrapping
+    assert timestamp_ms(ids[-1]) > clock.now_ms
+
+
+def test_ids_increase_when_the_clock_goes_back(clock):
+    generate = core.UUID7Generator()
+    before = generate()
+    clock.now_ms -= 5000
+    after = [generate() for _ in range(100)]
+    assert [before] + after == sorted([before] + after)
+    assert timestamp_ms(after[-1]) >= timestamp_ms(before)
+
+
+def test_ids_follow_the_clock_forward(clock):
+    generate = core.UUID7Generator()
+    before = generate()
+    clock.now_ms += 1
+    after = generate()
+    assert after > before
+    assert timestamp_ms(after) == clock.now_ms
+
+
+def test_status_id_format_selects_the_generator(monkeypatch, clock):
+    monkeypatch.setattr(core, "STATUS_ID_FORMAT", "uuid7")
+    assert uuid.UUID(core.new_status_id()).version == 7
+    monkeypatch.setattr(core, "STATUS_ID_FORMAT", "uuid4")
+    assert uuid.UUID(core.new_status_id()).version == 4
@@ -0,0 +1,165 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from pymongo.errors import AutoReconnect
+
+import core
+import server
+from core import DUPLICATE_KEY, new_status_doc
+
+
+class MemoryStore:
+    # Stands in for MongoDB and records each insert_many; set block to an
+    # Event to hold inserts until it is set, or fail=True to take it down
+    def __init__(self):
+        self.docs = {}
+        self.batches = []
+        self.block = None
+        self.fail = False
+
+    async def insert(self, status_docs):
+        if self.block is not None:
+            await self.block.wait()
+        if self.fail:
+            raise AutoReconnect("database is down")
+        self.batches.append([doc["id"] for doc in status_docs])
+        write_errors = {}
+        for index, doc in enumerate(status_docs):
+            if doc["id"] in self.docs:
+                write_errors[index] = {"index": index, "code": DUPLICATE_KEY, "errmsg": "duplicate key"}
+            else:
+                self.docs[doc["id"]] = doc
+        return write_errors
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = MemoryStore()
+
+    async def status_docs_written(status_docs):
+        pass
+
+    monkeypatch.setattr(server, "status_store", store)
+    monkeypatch.setattr(server, "status_docs_written", status_docs_written)
+    monkeypatch.setattr(server, "status_journal", None)
+    monkeypatch.setattr(server, "mongo_breaker", core.CircuitBreaker(3, 5000))
+    return store
+
+
+def write_buffer(batch_size=100, flush_ms=10000, queue_size=100, ack="flush", enqueue_timeout_ms=1000):
+    buffer = server.StatusWriteBuffer(batch_size, flush_ms, queue_size, ack, enqueue_timeout_ms)
+    buffer.start()
+    return buffer
+
+
+def test_full_batch_is_flushed_without_waiting_for_the_timer(store):
+    status_docs = [new_status_doc(f"client-{i}") for i in range(3)]
+
+    async def run():
+        buffer = write_buffer(batch_size=3)
+        futures = [await buffer.put(doc) for doc in status_docs]
+        await asyncio.wait_for(asyncio.gather(*futures), 1)
+        buffer.task.cancel()
+
+    asyncio.run(run())
+    assert store.batches == [[doc["id"] for doc in status_docs]]
+
+
+def test_partial_batch_is_flushed_by_the_timer(store):
+    status_docs = [new_status_doc(f"client-{i}") for i in range(2)]
+
+    async def run():
+        buffer = write_buffer(flush_ms=10)
+        futures = [await buffer.put(doc) for doc in status_docs]
+        await asyncio.sleep(0.005)
+        flushed_early = bool(store.batches)
+        await asyncio.wait_for(asyncio.gather(*futures), 1)
+        buffer.task.cancel()
+        return flushed_early
+
+    assert asyncio.run(run()) is False
+    assert store.batches == [[doc["id"] for doc in status_docs]]
+
+
+def test_flush_ack_reports_each_write_error(store):
+    duplicate, fresh = new_status_doc("duplicate"), new_status_doc("fresh")
+    store.docs[duplicate["id"]] = duplicate
+
+    async def run():
+        buffer = write_buffer(flush_ms=1)
+        futures = [await buffer.put(duplicate), await buffer.put(fresh)]
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        await buffer.drain()
+        return results
+
+    results = asyncio.run(run())
+    assert isinstance(results[0], HTTPException) and results[0].status_code == 409
+    assert results[1] is None
+
+
+def test_enqueue_ack_returns_before_the_write(store):
+    status_doc = new_status_doc("client")
+
+    async def run():
+        buffer = write_buffer(ack="enqueue")
+        assert await buffer.put(status_doc) is None
+        stored_on_ack = status_doc["id"] in store.docs
+        await buffer.drain()
+        return stored_on_ack
+
+    assert asyncio.run(run()) is False
+    assert list(store.docs) == [status_doc["id"]]
+
+
+def test_full_queue_sheds_writes(store):
+    async def run():
+        store.block = asyncio.Event()
+        buffer = write_buffer(flush_ms=0, queue_size=1, enqueue_timeout_ms=10)
+        # The first write is held in a flush, the second fills the queue
+        await buffer.put(new_status_doc("flushing"))
+        await asyncio.sleep(0.01)
+        await buffer.put(new_status_doc("queued"))
+        with pytest.raises(HTTPException) as excinfo:
+            await buffer.put(new_status_doc("shed"))
+        store.block.set()
+        await buffer.drain()
+        return excinfo.value
+
+    error = asyncio.run(run())
+    assert error.status_code == 503
+    assert error.headers == {"Retry-After": "1"}
+    assert len(store.docs) == 2
+
+
+def test_connection_failure_is_retryable_for_every_write(store):
+    store.fail = True
+
+    async def run():
+        buffer = write_buffer(flush_ms=1)
+        futures = [await buffer.put(new_status_doc(f"client-{i}")) for i in range(3)]
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        await buffer.drain()
+        return results
+
+    results = asyncio.run(run())
+    assert all(isinstance(error, HTTPException) and error.status_code == 503 for error in results)
+    assert all(error.headers == {"Retry-After": "5"} for error in results)
+    # Each request re-raises its own instance
+    assert len({id(error) for error in results}) == 3
+
+
+def test_drain_flushes_what_is_queued_and_refuses_new_writes(store):
+    status_docs = [new_status_doc(f"client-{i}") for i in range(5)]
+
+    async def run():
+        buffer = write_buffer(ack="enqueue")
+        for doc in status_docs:
+            await buffer.put(doc)
+        await buffer.drain()
+        with pytest.raises(HTTPException) as excinfo:
+            await buffer.put(new_status_doc("late"))
+        return excinfo.value.status_code
+
+    assert asyncio.run(run()) == 503
+    assert store.batches == [[doc["id"] for doc in status_docs]]